@@ -5,6 +5,8 @@ osp = os.path
 
 import tensorflow as tf
 
+from rlfd import normalizer
+
 AGENTS = {}
 
 
@@ -89,6 +91,27 @@ class Agent(tf.Module, metaclass=abc.ABCMeta):
   def get_saved_model(self, model):
     return self._saved_model[model]
 
+  def _prefetch_batches(self, buffer, batch_size, keys):
+    """Returns a generator of batches sampled from buffer in the background
+    while the previous batch is being trained on.
+
+    :param keys names of the fields to return, in order
+    """
+
+    # Own generator, buffer.sample_into keeps drawing from the buffer's one
+    rng = buffer.spawn_rng()
+
+    def _sample():
+      while True:
+        batch = buffer.sample(batch_size, rng=rng)
+        yield tuple(batch[k] for k in keys)
+
+    dataset = tf.data.Dataset.from_generator(
+        _sample, output_types=(tf.float32,) * len(keys))
+    dataset = dataset.prefetch(tf.data.experimental.AUTOTUNE)
+    # Plain generator so that the iterator is not tracked by the checkpoint
+    return (batch for batch in dataset)
+
   def save(self, policy_path, ckpt_path=None):
     """Pickles the current policy."""
     with open(policy_path, "wb") as f:
@@ -100,6 +123,7 @@ class Agent(tf.Module, metaclass=abc.ABCMeta):
       self._tf_ckpt_manager = tf.train.CheckpointManager(self._tf_ckpt,
                                                          ckpt_path,
                                                          max_to_keep=1)
+      self._tf_ckpt_dir = ckpt_path
     self._tf_ckpt_manager.save()
 
   def load(self, ckpt_path):
@@ -110,6 +134,10 @@ class Agent(tf.Module, metaclass=abc.ABCMeta):
     # Some variables may not have been contructed yet, but they should be for
     # plotting only, so no need to worry about.
     result.assert_existing_objects_matched()
+    # Normalizers keep their derived terms out of the checkpoint.
+    for module in self.submodules:
+      if isinstance(module, normalizer.Normalizer):
+        module.recompute_affine()
 
   def __getstate__(self):
     """For pickle. Store weights"""
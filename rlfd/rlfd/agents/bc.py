@@ -153,15 +153,8 @@ class BC(agent.Agent):
       self._update_stats(experiences)
 
   def _update_stats(self, experiences):
-    # add transitions to normalizer
-    if self.fix_T:
-      transitions = {
-          k: v.reshape((v.shape[0] * v.shape[1], v.shape[2])).copy()
-          for k, v in experiences.items()
-      }
-    else:
-      transitions = experiences.copy()
-    o_tf = tf.convert_to_tensor(transitions["o"], dtype=tf.float32)
+    # add transitions to normalizer, update flattens episode batches itself
+    o_tf = tf.convert_to_tensor(experiences["o"], dtype=tf.float32)
     self._actor_o_norm.update(o_tf)
 
   @tf.function
@@ -181,11 +174,14 @@ class BC(agent.Agent):
 
     self.offline_training_step.assign_add(1)
 
+  def before_offline_hook(self):
+    self._offline_batches = self._prefetch_batches(self.offline_buffer,
+                                                   self.offline_batch_size,
+                                                   ["o", "u"])
+
   def train_offline(self):
     with tf.summary.record_if(lambda: self.offline_training_step % 200 == 0):
-      batch = self.offline_buffer.sample(self.offline_batch_size)
-      o_tf = tf.convert_to_tensor(batch["o"], dtype=tf.float32)
-      u_tf = tf.convert_to_tensor(batch["u"], dtype=tf.float32)
+      o_tf, u_tf = next(self._offline_batches)
       self._train_offline_graph(o_tf, u_tf)
 
   def store_experiences(self, experiences):
@@ -4,12 +4,10 @@ osp = os.path
 
 import numpy as np
 import tensorflow as tf
-import tensorflow_probability as tfp
-tfd = tfp.distributions
 tfk = tf.keras
 
 from rlfd import memory, normalizer, policies
-from rlfd.agents import agent, sac, sac_networks
+from rlfd.agents import agent, networks, sac, sac_networks
 
 
 class CQL(sac.SAC):
@@ -153,6 +151,9 @@ class CQL(sac.SAC):
 
   def _cql_criticq_loss_graph(self, o, o_2, u, r, done, step):
     pi_2, logprob_pi_2 = self._actor([self._actor_o_norm(o_2)])
+    # Normalize once and share across both critics
+    critic_o = self._critic_o_norm(o)
+    critic_o_2 = self._critic_o_norm(o_2)
 
     # Immediate reward
     target_q = r
@@ -161,36 +162,34 @@ class CQL(sac.SAC):
       potential_curr = self.shaping.potential(o=o, u=u)
       potential_next = self.shaping.potential(o=o_2, u=pi_2)
       target_q += (1.0 - done) * self.gamma * potential_next - potential_curr
+    # Stack the weights of each critic pair once for all evaluations below.
+    twin_q = networks.TwinCritic(self._criticq1, self._criticq2)
+    target_twin_q = networks.TwinCritic(self._criticq1_target,
+                                        self._criticq2_target)
     # Q value from next state
-    target_next_q1 = self._criticq1_target([self._critic_o_norm(o_2), pi_2])
-    target_next_q2 = self._criticq2_target([self._critic_o_norm(o_2), pi_2])
+    target_next_q1, target_next_q2 = target_twin_q([critic_o_2, pi_2])
     target_next_min_q = tf.minimum(target_next_q1, target_next_q2)
     target_q += ((1.0 - done) * self.gamma *
                  (target_next_min_q - self.alpha * logprob_pi_2))
     target_q = tf.stop_gradient(target_q)
 
-    td_loss_q1 = self._huber_loss(target_q,
-                                  self._criticq1([self._critic_o_norm(o), u]))
-    td_loss_q2 = self._huber_loss(target_q,
-                                  self._criticq2([self._critic_o_norm(o), u]))
+    q1, q2 = twin_q([critic_o, u])
+    td_loss_q1 = self._huber_loss(target_q, q1)
+    td_loss_q2 = self._huber_loss(target_q, q2)
     td_loss = td_loss_q1 + td_loss_q2
     # Being Conservative (Eqn.4)
-    critic_o = self._critic_o_norm(o)
     # second term
-    max_term_q1 = self._criticq1([critic_o, u])
-    max_term_q2 = self._criticq2([critic_o, u])
+    max_term_q1 = q1
+    max_term_q2 = q2
     # first term (uniform)
     num_samples = 10
     tiled_critic_o = tf.tile(tf.expand_dims(critic_o, axis=1),
                              [1, num_samples] + [1] * len(self.dimo))
-    uni_u_dist = tfd.Uniform(low=-self.max_u * tf.ones(self.dimu),
-                             high=self.max_u * tf.ones(self.dimu))
-    uni_u = uni_u_dist.sample((tf.shape(u)[0], num_samples))
-    logprob_uni_u = tf.reduce_sum(uni_u_dist.log_prob(uni_u),
-                                  axis=list(range(2, 2 + len(self.dimu))),
-                                  keepdims=True)
-    uni_q1 = self._criticq1([tiled_critic_o, uni_u])
-    uni_q2 = self._criticq2([tiled_critic_o, uni_u])
+    uni_u = tf.random.uniform((tf.shape(u)[0], num_samples, *self.dimu),
+                              -self.max_u, self.max_u)
+    # Uniform density is constant: -sum(log(high - low))
+    logprob_uni_u = -np.prod(self.dimu) * np.log(2.0 * self.max_u)
+    uni_q1, uni_q2 = twin_q([tiled_critic_o, uni_u])
     uni_q1_logprob_uni_u = uni_q1 - logprob_uni_u
     uni_q2_logprob_uni_u = uni_q2 - logprob_uni_u
     # first term (policy)
@@ -198,8 +197,7 @@ class CQL(sac.SAC):
     tiled_actor_o = tf.tile(tf.expand_dims(actor_o, axis=1),
                             [1, num_samples] + [1] * len(self.dimo))
     pi, logprob_pi = self._actor([tiled_actor_o])
-    pi_q1 = self._criticq1([tiled_critic_o, pi])
-    pi_q2 = self._criticq2([tiled_critic_o, pi])
+    pi_q1, pi_q2 = twin_q([tiled_critic_o, pi])
     pi_q1_logprob_pi = pi_q1 - logprob_pi
     pi_q2_logprob_pi = pi_q2 - logprob_pi
     # Note: log(2N) not included in this case since it is constant.
@@ -274,17 +272,39 @@ class CQL(sac.SAC):
 
     self.offline_training_step.assign_add(1)
 
+    # Update target networks
+    if self.offline_training_step % self.target_update_freq == 0:
+      self._copy_weights(self._criticq1, self._criticq1_target)
+      self._copy_weights(self._criticq2, self._criticq2_target)
+
+  def before_offline_hook(self):
+    # Packed on the first offline step, so that agents which never train
+    # offline (or have no offline data) do not copy the dataset to device.
+    self._offline_dataset = None
+
+  def _pack_offline_dataset(self):
+    # The offline dataset is fixed, keep it on the training device so that
+    # batches are gathered in graph instead of copied from numpy every step.
+    # All fields are packed into one [N, sum(dims)] tensor so that a batch is
+    # a single gather followed by a split.
+    dataset = next(self.offline_buffer.sample(return_iterator=True))
+    fields = [dataset[k] for k in ["o", "o_2", "u", "r", "done"]]
+    self._offline_dataset_splits = [v.shape[-1] for v in fields]
+    packed = np.concatenate(fields, axis=-1)
+    self._offline_dataset = tf.convert_to_tensor(packed, dtype=tf.float32)
+
+  @tf.function
+  def _sample_offline_graph(self):
+    num_steps = tf.shape(self._offline_dataset, out_type=tf.int64)[0]
+    inds = tf.random.uniform([self.offline_batch_size],
+                             maxval=num_steps,
+                             dtype=tf.int64)
+    batch = tf.gather(self._offline_dataset, inds)
+    return tf.split(batch, self._offline_dataset_splits, axis=-1)
+
   def train_offline(self):
+    if self._offline_dataset is None:
+      self._pack_offline_dataset()
     with tf.summary.record_if(lambda: self.offline_training_step % 1000 == 0):
-      batch = self.offline_buffer.sample(self.offline_batch_size)
-
-      o_tf = tf.convert_to_tensor(batch["o"], dtype=tf.float32)
-      o_2_tf = tf.convert_to_tensor(batch["o_2"], dtype=tf.float32)
-      u_tf = tf.convert_to_tensor(batch["u"], dtype=tf.float32)
-      r_tf = tf.convert_to_tensor(batch["r"], dtype=tf.float32)
-      done_tf = tf.convert_to_tensor(batch["done"], dtype=tf.float32)
-
-      self._train_offline_graph(o_tf, o_2_tf, u_tf, r_tf, done_tf)
-      if self.offline_training_step % self.target_update_freq == 0:
-        self._copy_weights(self._criticq1, self._criticq1_target)
-        self._copy_weights(self._criticq2, self._criticq2_target)
\ No newline at end of file
+      o_tf, o_2_tf, u_tf, r_tf, done_tf = self._sample_offline_graph()
+      self._train_offline_graph(o_tf, o_2_tf, u_tf, r_tf, done_tf)
\ No newline at end of file
@@ -4,12 +4,10 @@ osp = os.path
 
 import numpy as np
 import tensorflow as tf
-import tensorflow_probability as tfp
-tfd = tfp.distributions
 tfk = tf.keras
 
 from rlfd import memory, normalizer, policies
-from rlfd.agents import agent, cql, sac_networks
+from rlfd.agents import agent, cql, networks, sac_networks
 
 
 class CQLDP(cql.CQL):
@@ -112,6 +110,9 @@ class CQLDP(cql.CQL):
 
   def _cql_criticq_loss_graph(self, o, o_2, u, r, done, step):
     pi_2, logprob_pi_2 = self._actor([self._actor_o_norm(o_2)])
+    # Normalize once and share across both critics
+    critic_o = self._critic_o_norm(o)
+    critic_o_2 = self._critic_o_norm(o_2)
 
     # Immediate reward
     target_q = r
@@ -120,36 +121,34 @@ class CQLDP(cql.CQL):
       potential_curr = self.shaping.potential(o=o, u=u)
       potential_next = self.shaping.potential(o=o_2, u=pi_2)
       target_q += (1.0 - done) * self.gamma * potential_next - potential_curr
+    # Stack the weights of each critic pair once for all evaluations below.
+    twin_q = networks.TwinCritic(self._criticq1, self._criticq2)
+    target_twin_q = networks.TwinCritic(self._criticq1_target,
+                                        self._criticq2_target)
     # Q value from next state
-    target_next_q1 = self._criticq1_target([self._critic_o_norm(o_2), pi_2])
-    target_next_q2 = self._criticq2_target([self._critic_o_norm(o_2), pi_2])
+    target_next_q1, target_next_q2 = target_twin_q([critic_o_2, pi_2])
     target_next_min_q = tf.minimum(target_next_q1, target_next_q2)
     target_q += ((1.0 - done) * self.gamma *
                  (target_next_min_q - self.alpha * logprob_pi_2))
     target_q = tf.stop_gradient(target_q)
 
-    td_loss_q1 = self._huber_loss(target_q,
-                                  self._criticq1([self._critic_o_norm(o), u]))
-    td_loss_q2 = self._huber_loss(target_q,
-                                  self._criticq2([self._critic_o_norm(o), u]))
+    q1, q2 = twin_q([critic_o, u])
+    td_loss_q1 = self._huber_loss(target_q, q1)
+    td_loss_q2 = self._huber_loss(target_q, q2)
     td_loss = td_loss_q1 + td_loss_q2
     # Being Conservative (Eqn.4)
-    critic_o = self._critic_o_norm(o)
     # second term
-    max_term_q1 = self._criticq1([critic_o, u])
-    max_term_q2 = self._criticq2([critic_o, u])
+    max_term_q1 = q1
+    max_term_q2 = q2
     # first term (uniform)
     num_samples = 10
     tiled_critic_o = tf.tile(tf.expand_dims(critic_o, axis=1),
                              [1, num_samples] + [1] * len(self.dimo))
-    uni_u_dist = tfd.Uniform(low=-self.max_u * tf.ones(self.dimu),
-                             high=self.max_u * tf.ones(self.dimu))
-    uni_u = uni_u_dist.sample((tf.shape(u)[0], num_samples))
-    logprob_uni_u = tf.reduce_sum(uni_u_dist.log_prob(uni_u),
-                                  axis=list(range(2, 2 + len(self.dimu))),
-                                  keepdims=True)
-    uni_q1 = self._criticq1([tiled_critic_o, uni_u])
-    uni_q2 = self._criticq2([tiled_critic_o, uni_u])
+    uni_u = tf.random.uniform((tf.shape(u)[0], num_samples, *self.dimu),
+                              -self.max_u, self.max_u)
+    # Uniform density is constant: -sum(log(high - low))
+    logprob_uni_u = -np.prod(self.dimu) * np.log(2.0 * self.max_u)
+    uni_q1, uni_q2 = twin_q([tiled_critic_o, uni_u])
     # apply double side penalty
     uni_q1 = tf.abs(uni_q1 - self.target_lower_bound)
     uni_q2 = tf.abs(uni_q2 - self.target_lower_bound)
@@ -161,8 +160,7 @@ class CQLDP(cql.CQL):
     tiled_actor_o = tf.tile(tf.expand_dims(actor_o, axis=1),
                             [1, num_samples] + [1] * len(self.dimo))
     pi, logprob_pi = self._actor([tiled_actor_o])
-    pi_q1 = self._criticq1([tiled_critic_o, pi])
-    pi_q2 = self._criticq2([tiled_critic_o, pi])
+    pi_q1, pi_q2 = twin_q([tiled_critic_o, pi])
     # apply double side penalty
     pi_q1 = tf.abs(pi_q1 - self.target_lower_bound)
     pi_q2 = tf.abs(pi_q2 - self.target_lower_bound)
@@ -4,8 +4,6 @@ osp = os.path
 
 import numpy as np
 import tensorflow as tf
-import tensorflow_probability as tfp
-tfd = tfp.distributions
 tfk = tf.keras
 
 from rlfd import memory
@@ -165,4 +163,9 @@ class CQLOnline(cql.CQL):
                         data=self.cql_weight,
                         step=self.online_training_step)
 
-    self.online_training_step.assign_add(1)
\ No newline at end of file
+    self.online_training_step.assign_add(1)
+
+    # Update target networks
+    if self.online_training_step % self.target_update_freq == 0:
+      self._copy_weights(self._criticq1, self._criticq1_target)
+      self._copy_weights(self._criticq2, self._criticq2_target)
\ No newline at end of file
@@ -0,0 +1,37 @@
+import tensorflow as tf
+
+
+class TwinCritic(object):
+  """Evaluates two critics of the same architecture on the same inputs with
+  one batched matmul per layer.
+
+  The weights of both critics are stacked when this object is created, so
+  create it once per loss graph (inside the gradient tape) and call it for
+  every evaluation of the pair.
+  """
+
+  def __init__(self, critic1, critic2):
+    self._weights = []
+    for (kernel1, bias1, activation), (kernel2, bias2, _) in zip(
+        critic1.dense_params(), critic2.dense_params()):
+      self._weights.append((tf.stack([kernel1, kernel2]),
+                            tf.stack([bias1, bias2])[:, tf.newaxis, :],
+                            activation))
+
+  def __call__(self, inputs):
+    """Returns (q1, q2)."""
+    o, u = inputs
+    kernel, bias, activation = self._weights[0]
+    dimo = o.shape[-1]
+    # Flatten leading dimensions, e.g. [batch, samples, dim] inputs
+    batch_shape = tf.shape(o)[:-1]
+    o = tf.cast(tf.reshape(o, [-1, dimo]), kernel.dtype)
+    u = tf.cast(tf.reshape(u, [-1, u.shape[-1]]), kernel.dtype)
+    # The input is shared, only the first layer needs to broadcast it
+    res = activation(
+        tf.einsum("bi,kij->kbj", o, kernel[:, :dimo]) +
+        tf.einsum("bi,kij->kbj", u, kernel[:, dimo:]) + bias)
+    for kernel, bias, activation in self._weights[1:]:
+      res = activation(tf.matmul(tf.cast(res, kernel.dtype), kernel) + bias)
+    res = tf.reshape(res, tf.concat([[2], batch_shape, [1]], axis=0))
+    return res[0], res[1]
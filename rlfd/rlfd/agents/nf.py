@@ -97,6 +97,7 @@ class NF(agent.Agent):
     self.dimo = self.dims["o"]
     self.dimu = self.dims["u"]
     self.max_u = max_u
+    self._inv_max_u = 1.0 / max_u
     self.fix_T = fix_T
     self.eps_length = eps_length
 
@@ -224,15 +225,8 @@ class NF(agent.Agent):
       self._update_stats(experiences)
 
   def _update_stats(self, experiences):
-    # add transitions to normalizer
-    if self.fix_T:
-      transitions = {
-          k: v.reshape((v.shape[0] * v.shape[1], v.shape[2])).copy()
-          for k, v in experiences.items()
-      }
-    else:
-      transitions = experiences.copy()
-    o_tf = tf.convert_to_tensor(transitions["o"], dtype=tf.float32)
+    # add transitions to normalizer, update flattens episode batches itself
+    o_tf = tf.convert_to_tensor(experiences["o"], dtype=tf.float32)
     self._maf_o_norm.update(o_tf)
     self._critic_o_norm.update(o_tf)
 
@@ -240,8 +234,8 @@ class NF(agent.Agent):
   def _train_offline_graph(self, o, u):
     with tf.name_scope('OfflineLosses/'):
       # Train maf
-      maf_input = tf.concat(
-          [self._maf_o_norm(o), u / self.max_u], axis=1)
+      maf_input = tf.concat([self._maf_o_norm(o), u * self._inv_max_u],
+                            axis=1)
 
       with tf.GradientTape(watch_accessed_variables=False) as tape:
         tape.watch(self._maf.trainable_weights)
@@ -272,8 +266,8 @@ class NF(agent.Agent):
       o = tf.concat((o, rand_o), axis=0)
       u = tf.concat((u, rand_u), axis=0)
 
-      maf_input = tf.concat(
-          [self._maf_o_norm(o),u / self.max_u], axis=1)
+      maf_input = tf.concat([self._maf_o_norm(o), u * self._inv_max_u],
+                            axis=1)
       logprob = self._maf(maf_input)
       logprob = tf.clip_by_value(logprob, -1e5, 1e5)
       logprob = tf.reshape(logprob, (-1, 1))
@@ -296,11 +290,14 @@ class NF(agent.Agent):
 
     self.offline_training_step.assign_add(1)
 
+  def before_offline_hook(self):
+    self._offline_batches = self._prefetch_batches(self.offline_buffer,
+                                                   self.offline_batch_size,
+                                                   ["o", "u"])
+
   def train_offline(self):
     with tf.summary.record_if(lambda: self.offline_training_step % 200 == 0):
-      batch = self.offline_buffer.sample(self.offline_batch_size)
-      o_tf = tf.convert_to_tensor(batch["o"], dtype=tf.float32)
-      u_tf = tf.convert_to_tensor(batch["u"], dtype=tf.float32)
+      o_tf, u_tf = next(self._offline_batches)
       self._train_offline_graph(o_tf, u_tf)
 
   def store_experiences(self, experiences):
@@ -7,7 +7,7 @@ import tensorflow as tf
 tfk = tf.keras
 
 from rlfd import memory, normalizer, policies
-from rlfd.agents import agent, sac_networks
+from rlfd.agents import agent, networks, sac_networks
 
 
 class SAC(agent.Agent):
@@ -97,6 +97,24 @@ class SAC(agent.Agent):
                          u=self.dimu,
                          r=(1,),
                          done=(1,))
+    # Preallocated array for the mixed online/offline training batches. All
+    # fields are packed into one [batch, sum(dims)] array so that a batch is a
+    # single host to device copy, _batch_buffers holds column views into it.
+    self._online_sample_size = int(self.online_batch_size *
+                                   self.online_sample_ratio)
+    self._offline_sample_size = int(self.online_batch_size *
+                                    (1 - self.online_sample_ratio))
+    batch_keys = ["o", "o_2", "u", "r", "done"]
+    self._batch_splits = [buffer_shapes[k][-1] for k in batch_keys]
+    self._batch = np.empty(
+        (self._online_sample_size + self._offline_sample_size,
+         sum(self._batch_splits)),
+        dtype=np.float32)
+    offsets = np.cumsum([0] + self._batch_splits)
+    self._batch_buffers = {
+        k: self._batch[:, offsets[i]:offsets[i + 1]]
+        for i, k in enumerate(batch_keys)
+    }
     if self.fix_T:
       buffer_shapes = {
           k: (self.eps_length,) + v for k, v in buffer_shapes.items()
@@ -232,15 +250,8 @@ class SAC(agent.Agent):
     self.pretrained_agent = pretrained_agent
 
   def _update_stats(self, experiences):
-    # add transitions to normalizer
-    if self.fix_T:
-      transitions = {
-          k: v.reshape((v.shape[0] * v.shape[1], v.shape[2])).copy()
-          for k, v in experiences.items()
-      }
-    else:
-      transitions = experiences.copy()
-    o_tf = tf.convert_to_tensor(transitions["o"], dtype=tf.float32)
+    # add transitions to normalizer, update flattens episode batches itself
+    o_tf = tf.convert_to_tensor(experiences["o"], dtype=tf.float32)
     self._actor_o_norm.update(o_tf)
     self._critic_o_norm.update(o_tf)
 
@@ -266,26 +277,22 @@ class SAC(agent.Agent):
     if self.norm_obs_online:
       self._update_stats(experiences)
 
-  def _merge_batch_experiences(self, batch1, batch2):
-    """Helper function to merge experiences of offline and online data."""
-    assert batch1.keys() == batch2.keys()
-    merged_batch = {}
-    for k in batch1.keys():
-      merged_batch[k] = np.concatenate((batch1[k], batch2[k]))
-
-    return merged_batch
-
   def sample_batch(self):
-    ratio = self.online_sample_ratio
-    online_batch = self.online_buffer.sample(int(self.online_batch_size *
-                                                 ratio))
-    offline_batch = self.offline_buffer.sample(
-        int(self.online_batch_size * (1 - ratio)))
-    batch = self._merge_batch_experiences(online_batch, offline_batch)
-    return batch
+    """Samples a mixed online/offline batch into preallocated arrays. The
+    returned arrays are overwritten by the next call.
+    """
+    self.online_buffer.sample_into(self._batch_buffers, 0,
+                                   self._online_sample_size)
+    self.offline_buffer.sample_into(self._batch_buffers,
+                                    self._online_sample_size,
+                                    self._offline_sample_size)
+    return self._batch_buffers
 
   def _sac_criticq_loss_graph(self, o, o_2, u, r, done, step):
     pi_2, logprob_pi_2 = self._actor([self._actor_o_norm(o_2)])
+    # Normalize once and share across both critics
+    critic_o = self._critic_o_norm(o)
+    critic_o_2 = self._critic_o_norm(o_2)
 
     # Immediate reward
     target_q = r
@@ -294,18 +301,20 @@ class SAC(agent.Agent):
       potential_curr = self.shaping.potential(o=o, u=u)
       potential_next = self.shaping.potential(o=o_2, u=pi_2)
       target_q += (1.0 - done) * self.gamma * potential_next - potential_curr
+    # Stack the weights of each critic pair once for all evaluations below.
+    twin_q = networks.TwinCritic(self._criticq1, self._criticq2)
+    target_twin_q = networks.TwinCritic(self._criticq1_target,
+                                        self._criticq2_target)
     # Q value from next state
-    target_next_q1 = self._criticq1_target([self._critic_o_norm(o_2), pi_2])
-    target_next_q2 = self._criticq2_target([self._critic_o_norm(o_2), pi_2])
+    target_next_q1, target_next_q2 = target_twin_q([critic_o_2, pi_2])
     target_next_min_q = tf.minimum(target_next_q1, target_next_q2)
     target_q += ((1.0 - done) * self.gamma *
                  (target_next_min_q - self.alpha * logprob_pi_2))
     target_q = tf.stop_gradient(target_q)
 
-    td_loss_q1 = self._huber_loss(target_q,
-                                  self._criticq1([self._critic_o_norm(o), u]))
-    td_loss_q2 = self._huber_loss(target_q,
-                                  self._criticq2([self._critic_o_norm(o), u]))
+    q1, q2 = twin_q([critic_o, u])
+    td_loss_q1 = self._huber_loss(target_q, q1)
+    td_loss_q2 = self._huber_loss(target_q, q2)
     td_loss = td_loss_q1 + td_loss_q2
 
     criticq_loss = tf.reduce_mean(td_loss)
@@ -316,8 +325,9 @@ class SAC(agent.Agent):
 
   def _sac_actor_loss_graph(self, o, u, step):
     pi, logprob_pi = self._actor([self._actor_o_norm(o)])
-    current_q1 = self._criticq1([self._critic_o_norm(o), pi])
-    current_q2 = self._criticq2([self._critic_o_norm(o), pi])
+    critic_o = self._critic_o_norm(o)
+    twin_q = networks.TwinCritic(self._criticq1, self._criticq2)
+    current_q1, current_q2 = twin_q([critic_o, pi])
     current_min_q = tf.minimum(current_q1, current_q2)
 
     actor_loss = tf.reduce_mean(self.alpha * logprob_pi - current_min_q)
@@ -378,28 +388,32 @@ class SAC(agent.Agent):
 
     self.online_training_step.assign_add(1)
 
+    # Update target networks
+    if self.online_training_step % self.target_update_freq == 0:
+      self._copy_weights(self._criticq1, self._criticq1_target)
+      self._copy_weights(self._criticq2, self._criticq2_target)
+
   def train_online(self):
     with tf.summary.record_if(lambda: self.online_training_step % 200 == 0):
 
-      batch = self.sample_batch()
-
-      o_tf = tf.convert_to_tensor(batch["o"], dtype=tf.float32)
-      o_2_tf = tf.convert_to_tensor(batch["o_2"], dtype=tf.float32)
-      u_tf = tf.convert_to_tensor(batch["u"], dtype=tf.float32)
-      r_tf = tf.convert_to_tensor(batch["r"], dtype=tf.float32)
-      done_tf = tf.convert_to_tensor(batch["done"], dtype=tf.float32)
-
+      self.sample_batch()
+      o_tf, o_2_tf, u_tf, r_tf, done_tf = tf.split(
+          tf.convert_to_tensor(self._batch), self._batch_splits, axis=-1)
       self._train_online_graph(o_tf, o_2_tf, u_tf, r_tf, done_tf)
-      if self.online_training_step % self.target_update_freq == 0:
-        self._copy_weights(self._criticq1, self._criticq1_target)
-        self._copy_weights(self._criticq2, self._criticq2_target)
 
   def _copy_weights(self, source, target, soft_target_tau=None):
     soft_target_tau = (soft_target_tau
                        if soft_target_tau else self.soft_target_tau)
-    copy_func = lambda v: v[1].assign(
-        (1.0 - soft_target_tau) * v[1] + soft_target_tau * v[0])
-    list(map(copy_func, zip(source.weights, target.weights)))
+    if soft_target_tau == 1.0:
+      for s, t in zip(source.weights, target.weights):
+        t.assign(s)
+    else:
+      # Polyak averaging written as t -= tau * (t - s), one fused update per var
+      for s, t in zip(source.weights, target.weights):
+        t.assign_sub(soft_target_tau * (t - s))
+    if isinstance(target, normalizer.Normalizer):
+      # The folded scale and shift are not weights, derive them again.
+      target.recompute_affine()
 
   @tf.function
   def _policy_inspect_graph(self, o):
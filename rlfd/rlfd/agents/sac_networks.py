@@ -1,15 +1,16 @@
+import math
+
 import tensorflow as tf
-import tensorflow_probability as tfp
 
 tfk = tf.keras
 tfl = tfk.layers
-tfd = tfp.distributions
 
 
 class Actor(tfk.Model):
   LOG_SIG_CAP_MAX = 2  # np.e**2 = 7.389
   LOG_SIG_CAP_MIN = -20  # np.e**-10 = 4.540e-05
   EPS = 1e-6
+  LOG_2PI = math.log(2 * math.pi)
 
   def __init__(self, dimo, dimu, max_u, layer_sizes, name="pi"):
     super().__init__(name=name)
@@ -17,7 +18,7 @@ class Actor(tfk.Model):
     self._dimo = dimo
     self._dimu = dimu
     self._max_u = max_u
-    self._dist = tfd.MultivariateNormalDiag
+    self._inv_max_u = 1.0 / max_u
 
     self._mlp_layers = []
     for size in layer_sizes:
@@ -48,9 +49,10 @@ class Actor(tfk.Model):
   @tf.function
   def call(self, inputs, sample=True):
     mean, logstd = self._compute_dist(inputs)
-    mean_pi = self._dist(mean, tf.exp(logstd)).sample() if sample else mean
-    logprob_pi = self._dist(mean, tf.exp(logstd)).log_prob(mean_pi)
-    logprob_pi = tf.expand_dims(logprob_pi, axis=-1)
+    std = tf.exp(logstd)
+    # Reparameterized sample, no distribution object needed
+    mean_pi = mean + std * tf.random.normal(tf.shape(mean)) if sample else mean
+    logprob_pi = self._log_prob(mean_pi, mean, logstd, std)
 
     squashed_mean_pi = tf.tanh(mean_pi)
     squashed_logprob_pi = self._squash_correction(logprob_pi, squashed_mean_pi)
@@ -60,18 +62,18 @@ class Actor(tfk.Model):
   @tf.function
   def compute_log_prob(self, inputs):
     o, u = inputs
-    u /= self._max_u
+    u *= self._inv_max_u
     mean, logstd = self._compute_dist([o])
-    logprob_pi = self._dist(mean, tf.exp(logstd)).log_prob(u)
-    logprob_pi = tf.expand_dims(logprob_pi, axis=-1)
+    logprob_pi = self._log_prob(u, mean, logstd, tf.exp(logstd))
     squashed_logprob_pi = self._squash_correction(logprob_pi, u)
     return squashed_logprob_pi
 
   @tf.function
   def compute_entropy(self, inputs):
     mean, logstd = self._compute_dist(inputs)
-    entropy = self._dist(mean, tf.exp(logstd)).entropy()
-    entropy = tf.expand_dims(entropy, axis=-1)
+    entropy = tf.reduce_sum(logstd + 0.5 * (1.0 + self.LOG_2PI),
+                            axis=-1,
+                            keepdims=True)
     return entropy
 
   def _compute_dist(self, inputs):
@@ -85,6 +87,13 @@ class Actor(tfk.Model):
                               self.LOG_SIG_CAP_MAX)
     return mean, logstd
 
+  def _log_prob(self, u, mean, logstd, std):
+    """Log density of a diagonal Gaussian, summed over action dimensions."""
+    z = (u - mean) / std
+    return -tf.reduce_sum(0.5 * (tf.square(z) + self.LOG_2PI) + logstd,
+                          axis=-1,
+                          keepdims=True)
+
   def _squash_correction(self, logprob_pi, squashed_mean_pi):
     diff = tf.reduce_sum(tf.math.log(1. - squashed_mean_pi**2 + self.EPS),
                          axis=-1,
@@ -135,6 +144,7 @@ class CriticQ(tfk.Model):
     self._dimo = dimo
     self._dimu = dimu
     self._max_u = max_u
+    self._inv_max_u = 1.0 / max_u
 
     self._mlp_layers = []
     for size in layer_sizes:
@@ -152,14 +162,38 @@ class CriticQ(tfk.Model):
         bias_initializer=
         "glorot_uniform",  #tfk.initializers.RandomUniform(-3e-3, 3e-3)
     )
+    # The first layer is applied to o and u separately (see call), build it
+    # for the concatenated input so that the weights match a single layer.
+    self._mlp_layers[0].build((None, self._dimo[0] + self._dimu[0]))
     # Create weights
     self([tf.zeros([0, *self._dimo]), tf.zeros([0, *self._dimu])])
 
   @tf.function
   def call(self, inputs):
     o, u = inputs
-    res = tf.concat([o, u / self._max_u], axis=-1)
-    for l in self._mlp_layers:
+    # [o, u] @ W + b computed as o @ W[:dimo] + u @ W[dimo:] + b to avoid
+    # concatenating the inputs.
+    first_layer = self._mlp_layers[0]
+    kernel = first_layer.kernel
+    res = first_layer.activation(
+        tf.tensordot(o, kernel[:self._dimo[0]], 1) +
+        tf.tensordot(u * self._inv_max_u, kernel[self._dimo[0]:], 1) +
+        first_layer.bias)
+    for l in self._mlp_layers[1:]:
       res = l(res)
     res = self._output_layer(res)
     return res
+
+  def dense_params(self):
+    """Returns (kernel, bias, activation) of every layer. The 1 / max_u action
+    scaling is folded into the first kernel, which takes the raw [o, u] input.
+    """
+    first_layer = self._mlp_layers[0]
+    kernel = tf.concat([
+        first_layer.kernel[:self._dimo[0]],
+        first_layer.kernel[self._dimo[0]:] * self._inv_max_u
+    ], 0)
+    params = [(kernel, first_layer.bias, first_layer.activation)]
+    for l in self._mlp_layers[1:] + [self._output_layer]:
+      params.append((l.kernel, l.bias, l.activation))
+    return params
@@ -135,17 +135,17 @@ class SACOffline(sac.SAC):
 
     self.offline_training_step.assign_add(1)
 
+    # Update target networks
+    if self.offline_training_step % self.target_update_freq == 0:
+      self._copy_weights(self._criticq1, self._criticq1_target)
+      self._copy_weights(self._criticq2, self._criticq2_target)
+
+  def before_offline_hook(self):
+    self._offline_batches = self._prefetch_batches(
+        self.offline_buffer, self.offline_batch_size,
+        ["o", "o_2", "u", "r", "done"])
+
   def train_offline(self):
     with tf.summary.record_if(lambda: self.offline_training_step % 1000 == 0):
-      batch = self.offline_buffer.sample(self.offline_batch_size)
-
-      o_tf = tf.convert_to_tensor(batch["o"], dtype=tf.float32)
-      o_2_tf = tf.convert_to_tensor(batch["o_2"], dtype=tf.float32)
-      u_tf = tf.convert_to_tensor(batch["u"], dtype=tf.float32)
-      r_tf = tf.convert_to_tensor(batch["r"], dtype=tf.float32)
-      done_tf = tf.convert_to_tensor(batch["done"], dtype=tf.float32)
-
-      self._train_offline_graph(o_tf, o_2_tf, u_tf, r_tf, done_tf)
-      if self.offline_training_step % self.target_update_freq == 0:
-        self._copy_weights(self._criticq1, self._criticq1_target)
-        self._copy_weights(self._criticq2, self._criticq2_target)
\ No newline at end of file
+      o_tf, o_2_tf, u_tf, r_tf, done_tf = next(self._offline_batches)
+      self._train_offline_graph(o_tf, o_2_tf, u_tf, r_tf, done_tf)
\ No newline at end of file
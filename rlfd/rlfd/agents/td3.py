@@ -7,7 +7,7 @@ import tensorflow as tf
 tfk = tf.keras
 
 from rlfd import memory, normalizer, policies
-from rlfd.agents import agent, td3_networks
+from rlfd.agents import agent, networks, td3_networks
 
 
 class TD3(agent.Agent):
@@ -50,13 +50,17 @@ class TD3(agent.Agent):
       online_data_strategy,
       # replay buffer
       buffer_size,
-      info):
+      info,
+      # float16 hidden layers in the critics, defaults to False so that agents
+      # pickled before this option existed can be restored
+      critic_mixed_precision=False):
     super().__init__(locals())
 
     self.dims = dims
     self.dimo = self.dims["o"]
     self.dimu = self.dims["u"]
     self.max_u = max_u
+    self.inv_max_u = 1.0 / max_u
     self.fix_T = fix_T
     self.eps_length = eps_length
     self.gamma = gamma
@@ -78,6 +82,7 @@ class TD3(agent.Agent):
     self.q_lr = q_lr
     self.pi_lr = pi_lr
     self.action_l2 = action_l2
+    self.critic_mixed_precision = critic_mixed_precision
     self.soft_target_tau = soft_target_tau
     self.target_update_freq = target_update_freq
 
@@ -102,6 +107,24 @@ class TD3(agent.Agent):
                          u=self.dimu,
                          r=(1,),
                          done=(1,))
+    # Preallocated array for the mixed online/offline training batches. All
+    # fields are packed into one [batch, sum(dims)] array so that a batch is a
+    # single host to device copy, _batch_buffers holds column views into it.
+    self._online_sample_size = int(self.online_batch_size *
+                                   self.online_sample_ratio)
+    self._offline_sample_size = int(self.online_batch_size *
+                                    (1 - self.online_sample_ratio))
+    batch_keys = ["o", "o_2", "u", "r", "done"]
+    self._batch_splits = [buffer_shapes[k][-1] for k in batch_keys]
+    self._batch = np.empty(
+        (self._online_sample_size + self._offline_sample_size,
+         sum(self._batch_splits)),
+        dtype=np.float32)
+    offsets = np.cumsum([0] + self._batch_splits)
+    self._batch_buffers = {
+        k: self._batch[:, offsets[i]:offsets[i + 1]]
+        for i, k in enumerate(batch_keys)
+    }
     if self.fix_T:
       buffer_shapes = {
           k: (self.eps_length,) + v for k, v in buffer_shapes.items()
@@ -138,15 +161,19 @@ class TD3(agent.Agent):
     self._critic_o_norm = normalizer.Normalizer(self.dimo, self.norm_eps,
                                                 self.norm_clip)
     self._criticq1 = td3_networks.Critic(self.dimo, self.dimu, self.max_u,
-                                         self.layer_sizes)
+                                         self.layer_sizes,
+                                         self.critic_mixed_precision)
     self._criticq1_target = td3_networks.Critic(self.dimo, self.dimu,
-                                                self.max_u, self.layer_sizes)
+                                                self.max_u, self.layer_sizes,
+                                                self.critic_mixed_precision)
     self._copy_weights(self._criticq1, self._criticq1_target, 1.0)
 
     self._criticq2 = td3_networks.Critic(self.dimo, self.dimu, self.max_u,
-                                         self.layer_sizes)
+                                         self.layer_sizes,
+                                         self.critic_mixed_precision)
     self._criticq2_target = td3_networks.Critic(self.dimo, self.dimu,
-                                                self.max_u, self.layer_sizes)
+                                                self.max_u, self.layer_sizes,
+                                                self.critic_mixed_precision)
     self._copy_weights(self._criticq2, self._criticq2_target, 1.0)
 
     self._criticq_optimizer = tfk.optimizers.Adam(learning_rate=self.q_lr)
@@ -236,15 +263,8 @@ class TD3(agent.Agent):
     self.pretrained_agent = pretrained_agent
 
   def _update_stats(self, experiences):
-    # add transitions to normalizer
-    if self.fix_T:
-      transitions = {
-          k: v.reshape((v.shape[0] * v.shape[1], v.shape[2])).copy()
-          for k, v in experiences.items()
-      }
-    else:
-      transitions = experiences.copy()
-    o_tf = tf.convert_to_tensor(transitions["o"], dtype=tf.float32)
+    # add transitions to normalizer, update flattens episode batches itself
+    o_tf = tf.convert_to_tensor(experiences["o"], dtype=tf.float32)
     self._actor_o_norm.update(o_tf)
     self._critic_o_norm.update(o_tf)
 
@@ -266,23 +286,16 @@ class TD3(agent.Agent):
     if self.norm_obs_online:
       self._update_stats(experiences)
 
-  def _merge_batch_experiences(self, batch1, batch2):
-    """Helper function to merge experiences from offline and online data."""
-    assert batch1.keys() == batch2.keys()
-    merged_batch = {}
-    for k in batch1.keys():
-      merged_batch[k] = np.concatenate((batch1[k], batch2[k]))
-
-    return merged_batch
-
   def sample_batch(self):
-    ratio = self.online_sample_ratio
-    online_batch = self.online_buffer.sample(int(self.online_batch_size *
-                                                 ratio))
-    offline_batch = self.offline_buffer.sample(
-        int(self.online_batch_size * (1 - ratio)))
-    batch = self._merge_batch_experiences(online_batch, offline_batch)
-    return batch
+    """Samples a mixed online/offline batch into preallocated arrays. The
+    returned arrays are overwritten by the next call.
+    """
+    self.online_buffer.sample_into(self._batch_buffers, 0,
+                                   self._online_sample_size)
+    self.offline_buffer.sample_into(self._batch_buffers,
+                                    self._online_sample_size,
+                                    self._offline_sample_size)
+    return self._batch_buffers
 
   def _td3_criticq_loss_graph(self, o, o_2, u, r, done, step):
     # Add noise to target policy output
@@ -292,6 +305,9 @@ class TD3(agent.Agent):
     u_2 = tf.clip_by_value(
         self._actor_target([self._actor_o_norm(o_2)]) + noise, -self.max_u,
         self.max_u)
+    # Normalize once and share across both critics
+    critic_o = self._critic_o_norm(o)
+    critic_o_2 = self._critic_o_norm(o_2)
 
     # Immediate reward
     target_q = r
@@ -300,17 +316,19 @@ class TD3(agent.Agent):
       potential_curr = self.shaping.potential(o=o, u=u)
       potential_next = self.shaping.potential(o=o_2, u=u_2)
       target_q += (1.0 - done) * self.gamma * potential_next - potential_curr
+    # Stack the weights of each critic pair once for all evaluations below.
+    twin_q = networks.TwinCritic(self._criticq1, self._criticq2)
+    target_twin_q = networks.TwinCritic(self._criticq1_target,
+                                        self._criticq2_target)
     # Q value from next state
-    target_next_q1 = self._criticq1_target([self._critic_o_norm(o_2), u_2])
-    target_next_q2 = self._criticq2_target([self._critic_o_norm(o_2), u_2])
+    target_next_q1, target_next_q2 = target_twin_q([critic_o_2, u_2])
     target_next_min_q = tf.minimum(target_next_q1, target_next_q2)
     target_q += (1.0 - done) * self.gamma * target_next_min_q
     target_q = tf.stop_gradient(target_q)
 
-    td_loss_q1 = self._huber_loss(target_q,
-                                  self._criticq1([self._critic_o_norm(o), u]))
-    td_loss_q2 = self._huber_loss(target_q,
-                                  self._criticq2([self._critic_o_norm(o), u]))
+    q1, q2 = twin_q([critic_o, u])
+    td_loss_q1 = self._huber_loss(target_q, q1)
+    td_loss_q2 = self._huber_loss(target_q, q2)
     td_loss = td_loss_q1 + td_loss_q2
 
     criticq_loss = tf.reduce_mean(td_loss)
@@ -320,22 +338,23 @@ class TD3(agent.Agent):
     return criticq_loss
 
   def _td3_actor_loss_graph(self, o, u, step):
+    critic_o = self._critic_o_norm(o)
     pi = self._actor([self._actor_o_norm(o)])
-    actor_loss = -tf.reduce_mean(self._criticq1([self._critic_o_norm(o), pi]))
-    actor_loss += self.action_l2 * tf.reduce_mean(tf.square(pi / self.max_u))
+    actor_loss = -tf.reduce_mean(self._criticq1([critic_o, pi]))
+    actor_loss += self.action_l2 * tf.reduce_mean(
+        tf.square(pi * self.inv_max_u))
     if self.online_data_strategy == "Shaping":
       actor_loss += -tf.reduce_mean(self.shaping.potential(o=o, u=pi))
     if self.online_data_strategy == "BC":
-      mask = np.concatenate(
-          (np.zeros(self.online_batch_size - self.offline_batch_size),
-           np.ones(self.offline_batch_size)),
-          axis=0)
-      demo_pi = tf.boolean_mask((pi), mask)
-      demo_u = tf.boolean_mask((u), mask)
+      # Demonstration rows are the last offline_batch_size rows of the batch
+      demo_start = self.online_batch_size - self.offline_batch_size
+      demo_pi = pi[demo_start:]
+      demo_u = u[demo_start:]
       if self.bc_params["q_filter"]:
-        q_u = self._criticq1([self._critic_o_norm(o), u])
-        q_pi = self._criticq1([self._critic_o_norm(o), pi])
-        q_filter_mask = tf.reshape(tf.boolean_mask(q_u > q_pi, mask), [-1])
+        demo_critic_o = critic_o[demo_start:]
+        q_u = self._criticq1([demo_critic_o, demo_u])
+        q_pi = self._criticq1([demo_critic_o, demo_pi])
+        q_filter_mask = tf.reshape(q_u > q_pi, [-1])
         bc_loss = tf.reduce_mean(
             tf.square(
                 tf.boolean_mask(demo_pi, q_filter_mask, axis=0) -
@@ -377,29 +396,33 @@ class TD3(agent.Agent):
 
     self.online_training_step.assign_add(1)
 
+    # Update target networks
+    if self.online_training_step % self.target_update_freq == 0:
+      self._copy_weights(self._actor, self._actor_target)
+      self._copy_weights(self._criticq1, self._criticq1_target)
+      self._copy_weights(self._criticq2, self._criticq2_target)
+
   def train_online(self):
     with tf.summary.record_if(lambda: self.online_training_step % 200 == 0):
 
-      batch = self.sample_batch()
-
-      o_tf = tf.convert_to_tensor(batch["o"], dtype=tf.float32)
-      o_2_tf = tf.convert_to_tensor(batch["o_2"], dtype=tf.float32)
-      u_tf = tf.convert_to_tensor(batch["u"], dtype=tf.float32)
-      r_tf = tf.convert_to_tensor(batch["r"], dtype=tf.float32)
-      done_tf = tf.convert_to_tensor(batch["done"], dtype=tf.float32)
-
-      self._train_online_graph(o_tf, o_2_tf, u_tf, r_tf, n_tf, done_tf)
-      if self.online_training_step % self.target_update_freq == 0:
-        self._copy_weights(self._actor, self._actor_target)
-        self._copy_weights(self._criticq1, self._criticq1_target)
-        self._copy_weights(self._criticq2, self._criticq2_target)
+      self.sample_batch()
+      o_tf, o_2_tf, u_tf, r_tf, done_tf = tf.split(
+          tf.convert_to_tensor(self._batch), self._batch_splits, axis=-1)
+      self._train_online_graph(o_tf, o_2_tf, u_tf, r_tf, done_tf)
 
   def _copy_weights(self, source, target, soft_target_tau=None):
     soft_target_tau = (soft_target_tau
                        if soft_target_tau else self.soft_target_tau)
-    copy_func = lambda v: v[1].assign(
-        (1.0 - soft_target_tau) * v[1] + soft_target_tau * v[0])
-    list(map(copy_func, zip(source.weights, target.weights)))
+    if soft_target_tau == 1.0:
+      for s, t in zip(source.weights, target.weights):
+        t.assign(s)
+    else:
+      # Polyak averaging written as t -= tau * (t - s), one fused update per var
+      for s, t in zip(source.weights, target.weights):
+        t.assign_sub(soft_target_tau * (t - s))
+    if isinstance(target, normalizer.Normalizer):
+      # The folded scale and shift are not weights, derive them again.
+      target.recompute_affine()
 
   @tf.function
   def _policy_inspect_graph(self, o):
@@ -35,28 +35,75 @@ class Actor(tfk.Model):
 
 class Critic(tfk.Model):
 
-  def __init__(self, dimo, dimu, max_u, layer_sizes, name="q"):
+  def __init__(self,
+               dimo,
+               dimu,
+               max_u,
+               layer_sizes,
+               mixed_precision=False,
+               name="q"):
     super().__init__(name=name)
 
     self._dimo = dimo
     self._dimu = dimu
     self._max_u = max_u
+    self._inv_max_u = 1.0 / max_u
 
+    # Hidden layers optionally compute in float16 with float32 variables, the
+    # output layer always returns float32 q values for the losses.
+    dtype = (tfk.mixed_precision.experimental.Policy("mixed_float16")
+             if mixed_precision else None)
+    self._hidden_dtype = tf.float16 if mixed_precision else tf.float32
     self._mlp_layers = []
     for size in layer_sizes:
       layer = tfl.Dense(units=size,
                         activation="relu",
-                        kernel_initializer="glorot_normal")
+                        kernel_initializer="glorot_normal",
+                        dtype=dtype)
       self._mlp_layers.append(layer)
-    self._output_layer = tfl.Dense(units=1, kernel_initializer="glorot_normal")
+    self._output_layer = tfl.Dense(units=1,
+                                   kernel_initializer="glorot_normal",
+                                   dtype="float32")
+    # The first layer is applied to o and u separately (see call), build it
+    # for the concatenated input so that the weights match a single layer.
+    self._mlp_layers[0].build((None, self._dimo[0] + self._dimu[0]))
     # Create weights
     self([tf.zeros([0, *self._dimo]), tf.zeros([0, *self._dimu])])
 
   @tf.function
   def call(self, inputs):
     o, u = inputs
-    res = tf.concat([o, u / self._max_u], axis=-1)
-    for l in self._mlp_layers:
+    # [o, u] @ W + b computed as o @ W[:dimo] + u @ W[dimo:] + b to avoid
+    # concatenating the inputs.
+    first_layer = self._mlp_layers[0]
+    kernel = tf.cast(first_layer.kernel, self._hidden_dtype)
+    bias = tf.cast(first_layer.bias, self._hidden_dtype)
+    o = tf.cast(o, self._hidden_dtype)
+    u = tf.cast(u * self._inv_max_u, self._hidden_dtype)
+    res = first_layer.activation(
+        tf.tensordot(o, kernel[:self._dimo[0]], 1) +
+        tf.tensordot(u, kernel[self._dimo[0]:], 1) + bias)
+    for l in self._mlp_layers[1:]:
       res = l(res)
     res = self._output_layer(res)
     return res
+
+  def dense_params(self):
+    """Returns (kernel, bias, activation) of every layer, cast to the dtype the
+    layer computes in. The 1 / max_u action scaling is folded into the first
+    kernel, which takes the raw [o, u] input.
+    """
+    first_layer = self._mlp_layers[0]
+    kernel = tf.concat([
+        first_layer.kernel[:self._dimo[0]],
+        first_layer.kernel[self._dimo[0]:] * self._inv_max_u
+    ], 0)
+    params = [(kernel, first_layer.bias, first_layer.activation)]
+    params += [(l.kernel, l.bias, l.activation) for l in self._mlp_layers[1:]]
+    params = [(tf.cast(kernel, self._hidden_dtype),
+               tf.cast(bias, self._hidden_dtype), activation)
+              for kernel, bias, activation in params]
+    l = self._output_layer
+    params.append((l.kernel, l.bias, l.activation))
+    return params
+
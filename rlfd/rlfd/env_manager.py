@@ -1,3 +1,5 @@
+import functools
+import importlib
 import os
 
 import numpy as np
@@ -5,8 +7,25 @@ import gym
 import gym.wrappers
 from gym import spaces
 
-import d4rl
-import gym_rlfd
+# Packages that register more environments with gym when imported. They pull
+# in mujoco and the d4rl dataset code, so they are only imported for names
+# that plain gym does not know.
+ENV_PACKAGES = ("gym_rlfd", "d4rl")
+
+
+def make_gym_env(env_name, **env_args):
+  """gym.make that imports ENV_PACKAGES in turn until env_name is registered.
+  Used as the env factory so that it also works in processes (e.g. pickled
+  policies, worker processes) that never constructed an EnvManager.
+  """
+  for package in (None,) + ENV_PACKAGES:
+    if package is not None:
+      importlib.import_module(package)
+    try:
+      return gym.make(env_name, **env_args)
+    except gym.error.UnregisteredEnv:
+      pass
+  raise NotImplementedError
 
 
 class EnvWrapper:
@@ -19,6 +38,9 @@ class EnvWrapper:
     self.env = make_env()
     self.r_scale = r_scale
     self.r_shift = r_shift
+    # (r + r_shift) / r_scale folded into r * inv_scale + bias
+    self._r_inv_scale = 1.0 / r_scale
+    self._r_bias = r_shift / r_scale
     if "_max_episode_steps" in self.env.__dict__:
       self.eps_length = self.env._max_episode_steps
     elif "max_path_length" in self.env.__dict__:
@@ -63,7 +85,7 @@ class EnvWrapper:
 
   def step(self, action):
     state, r, done, info = self.env.step(action)
-    r = (r + self.r_shift) / self.r_scale
+    r = r * self._r_inv_scale + self._r_bias
     return self._transform_state(state), r, done, info
 
   def close(self):
@@ -106,11 +128,8 @@ class EnvManager:
     # Customized envs: YWPickAndPlaceRandInit-v0, YWPegInHoleRandInit-v0
     #                  YWPegInHole2D-v0
     if self.make_env is None and gym is not None:
-      try:
-        gym.make(env_name, **env_args)
-        self.make_env = lambda: gym.make(env_name, **env_args)
-      except gym.error.UnregisteredEnv:
-        pass
+      make_gym_env(env_name, **env_args)  # raises if env_name is unknown
+      self.make_env = functools.partial(make_gym_env, env_name, **env_args)
 
     if self.make_env is None:
       raise NotImplementedError
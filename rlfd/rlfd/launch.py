@@ -15,7 +15,7 @@ import tensorflow as tf
 import ray
 from ray import tune
 
-from rlfd import plot, train, evaluate
+from rlfd import train, evaluate
 from rlfd.demo_utils import generate_demo
 
 
@@ -248,6 +248,8 @@ def main(targets, exp_dir, policy, save_dir, num_cpus, num_gpus, memory, time,
       print("Plotting.")
       print("=================================================")
       save_name = target.replace("plot:", "") if "plot:" in target else ""
+      # Imported here so that training runs do not load matplotlib
+      from rlfd import plot
       plot.main(
           dirs=[exp_dir],
           save_dir=save_dir,
@@ -53,15 +53,22 @@ class ReplayBuffer(object, metaclass=abc.ABCMeta):
     # memory management
     self._size = size
     self._current_size = 0
+    # PCG64 generator for sampling, seeded from the global numpy RNG so that
+    # set_global_seeds still makes runs reproducible.
+    self._seed_seq = np.random.SeedSequence(np.random.randint(2**31))
+    self._rng = np.random.default_rng(self._seed_seq)
 
-    # buffer
+    # buffer, terminal flags are 0/1 so they are stored as uint8. Samples are
+    # always returned as float32.
     self.buffers = {
-        key: np.empty([self._size, *shape], dtype=np.float32)
+        key: np.empty([self._size, *shape],
+                      dtype=np.uint8 if key == "done" else np.float32)
         for key, shape in buffer_shapes.items()
     }
 
   def load_from_file(self, data_file):
-    episode_batch = dict(np.load(data_file))
+    with np.load(data_file) as data:
+      episode_batch = dict(data)
     self.store(episode_batch)
     return episode_batch
 
@@ -76,9 +83,11 @@ class ReplayBuffer(object, metaclass=abc.ABCMeta):
              return_iterator=False,
              shuffle=False,
              include_partial_batch=False,
-             repeat=False):
+             repeat=False,
+             rng=None):
     """ Returns a dict {key: array(batch_size x shapes[key])}
     If batch_size is -1, this function should return the entire buffer (i.e. all stored transitions)
+    rng is the generator for random batches, defaults to the buffer's own.
     """
     assert self._current_size > 0, "Replay buffer is empty."
     if return_iterator:
@@ -86,7 +95,21 @@ class ReplayBuffer(object, metaclass=abc.ABCMeta):
                                    repeat)
     else:
       assert batch_size != None, "Must provide batch size to sample randomly."
-      return self._sample_random(batch_size)
+      return self._sample_random(batch_size,
+                                 self._rng if rng is None else rng)
+
+  def spawn_rng(self):
+    """Returns a generator independent of the one used by sample, for
+    sampling from another thread.
+    """
+    return np.random.default_rng(self._seed_seq.spawn(1)[0])
+
+  def sample_into(self, out, offset, batch_size):
+    """ Samples batch_size transitions randomly and writes them into
+    out[key][offset:offset + batch_size] instead of allocating new arrays.
+    """
+    assert self._current_size > 0, "Replay buffer is empty."
+    self._sample_random_into(out, offset, batch_size)
 
   def store(self, data):
     """ Store data into the replay buffer.
@@ -132,9 +155,13 @@ class ReplayBuffer(object, metaclass=abc.ABCMeta):
     """store batch of data into the replay buffer"""
 
   @abc.abstractmethod
-  def _sample_random(self, batch_size):
+  def _sample_random(self, batch_size, rng):
     """Sample a batch of sizee batch_size randomly from the replay buffer"""
 
+  @abc.abstractmethod
+  def _sample_random_into(self, out, offset, batch_size):
+    """Sample a batch of size batch_size randomly into out at offset"""
+
   @abc.abstractmethod
   def _sample_iterator(self, batch_size, shuffle, include_partial_batch,
                        repeat):
@@ -161,7 +188,8 @@ class StepBaseReplayBuffer(ReplayBuffer):
 
   @staticmethod
   def construct_from_file(data_file):
-    experiences = dict(np.load(data_file))
+    with np.load(data_file) as data:
+      experiences = dict(data)
     buffer_shapes = {k: v.shape[1:] for k, v in experiences.items()}
     buffer_size = None
     for v in experiences.values():
@@ -183,25 +211,36 @@ class StepBaseReplayBuffer(ReplayBuffer):
     """current number of environment episodes stored in the replay buffer"""
     raise ValueError("Number of episodes unknown in step based replay buffer.")
 
-  def _sample_random(self, batch_size):
+  def _sample_random(self, batch_size, rng):
     """Sample a batch of sizee batch_size randomly from the replay buffer"""
-    inds = np.random.randint(0, self.stored_steps, batch_size)
+    inds = rng.integers(0, self.stored_steps, batch_size)
     transitions = {
-        key: self.buffers[key][inds].copy() for key in self.buffers.keys()
+        key: self.buffers[key][inds].astype(np.float32, copy=False)
+        for key in self.buffers.keys()
     }
 
     return transitions
 
+  def _sample_random_into(self, out, offset, batch_size):
+    inds = self._rng.integers(0, self.stored_steps, batch_size)
+    for key, buffer in self.buffers.items():
+      dst = out[key][offset:offset + batch_size]
+      if buffer.dtype == dst.dtype:
+        np.take(buffer, inds, axis=0, out=dst, mode="clip")
+      else:
+        dst[...] = buffer[inds]
+
   def _sample_iterator(self, batch_size, shuffle, include_partial_batch,
                        repeat):
     """return a iterator from sampler"""
-    inds = np.arange(self.stored_steps)
-    if shuffle:
-      np.random.shuffle(inds)
-
+    # Views of the stored prefix unless shuffled, batches below are copies
     transitions = {
-        key: self.buffers[key][inds].copy() for key in self.buffers.keys()
+        key: buffer[:self.stored_steps].astype(np.float32, copy=False)
+        for key, buffer in self.buffers.items()
     }
+    if shuffle:
+      inds = self._rng.permutation(self.stored_steps)
+      transitions = {key: value[inds] for key, value in transitions.items()}
 
     if batch_size == None:
       batch_size = self.stored_steps
@@ -252,18 +291,12 @@ class StepBaseReplayBuffer(ReplayBuffer):
     assert inc <= self._size, "batch committed to replay is too large!"
     assert inc > 0, "invalid increment"
     # go consecutively until you hit the end, and restart from the beginning.
-    if self._pointer + inc <= self._size:
-      idx = np.arange(self._pointer, self._pointer + inc)
-      self._pointer += inc
-    else:
-      overflow = inc - (self._size - self._pointer)
-      idx_a = np.arange(self._pointer, self._size)
-      idx_b = np.arange(0, overflow)
-      idx = np.concatenate([idx_a, idx_b])
-      self._pointer = overflow
-
     if inc == 1:
-      idx = idx[0]
+      idx = self._pointer
+    else:
+      idx = np.arange(self._pointer, self._pointer + inc)
+      np.mod(idx, self._size, out=idx)
+    self._pointer = (self._pointer + inc) % self._size
     return idx
 
 
@@ -284,7 +317,8 @@ class EpisodeBaseReplayBuffer(ReplayBuffer):
 
   @staticmethod
   def construct_from_file(data_file):
-    experiences = dict(np.load(data_file))
+    with np.load(data_file) as data:
+      experiences = dict(data)
     buffer_shapes = {k: v.shape[1:] for k, v in experiences.items()}
     buffer_size = None
     T = None
@@ -295,7 +329,8 @@ class EpisodeBaseReplayBuffer(ReplayBuffer):
       else:
         buffer_size = v.shape[0]
         T = v.shape[1]
-    replay_buffer = EpisodeBaseReplayBuffer(buffer_shapes, buffer_size * T, T)
+    replay_buffer = EpisodeBaseReplayBuffer(buffer_shapes, buffer_size * T,
+                                            T)
     replay_buffer.store(experiences)
     return replay_buffer
 
@@ -309,46 +344,57 @@ class EpisodeBaseReplayBuffer(ReplayBuffer):
     """current number of environment episodes stored in the replay buffer"""
     return self._current_size
 
-  def _sample_random(self, batch_size):
+  def _sample_random(self, batch_size, rng):
     """ Returns a dict {key: array(batch_size x shapes[key])}
     """
 
-    buffers = {}
-    for key in self.buffers.keys():
-      buffers[key] = self.buffers[key][:self._current_size]
-
-    episode_idxs = np.random.randint(self._current_size, size=batch_size)
-    step_idxs = np.random.randint(self.T, size=batch_size)
+    episode_idxs = rng.integers(self._current_size, size=batch_size)
+    step_idxs = rng.integers(self.T, size=batch_size)
 
     transitions = {
-        key: buffers[key][episode_idxs, step_idxs].copy()
-        for key in buffers.keys()
+        key: self._flatten(buffer).take(
+            self._flat_idxs(buffer, episode_idxs, step_idxs),
+            axis=0).astype(np.float32, copy=False)
+        for key, buffer in self.buffers.items()
     }
 
     return transitions
 
-  def _sample_iterator(self, batch_size, shuffle, include_partial_batch,
-                       repeat):
+  def _sample_random_into(self, out, offset, batch_size):
+    episode_idxs = self._rng.integers(self._current_size, size=batch_size)
+    step_idxs = self._rng.integers(self.T, size=batch_size)
+    for key, buffer in self.buffers.items():
+      inds = self._flat_idxs(buffer, episode_idxs, step_idxs)
+      dst = out[key][offset:offset + batch_size]
+      if buffer.dtype == dst.dtype:
+        np.take(self._flatten(buffer), inds, axis=0, out=dst, mode="clip")
+      else:
+        dst[...] = self._flatten(buffer)[inds]
 
-    buffers = {}
-    for key in self.buffers.keys():
-      buffers[key] = self.buffers[key][:self._current_size]
+  def _flatten(self, buffer):
+    """[episodes, T, ...] buffer as a [episodes * T, ...] view."""
+    return buffer.reshape(-1, *buffer.shape[2:])
+
+  def _flat_idxs(self, buffer, episode_idxs, step_idxs):
+    """Row indices into the flattened buffer, one gather instead of two-level
+    fancy indexing."""
+    return episode_idxs * buffer.shape[1] + step_idxs
 
-    episode_idxs = np.repeat(np.arange(self._current_size), self.T)
-    step_idxs = np.tile(np.arange(self.T), self._current_size)
+  def _sample_iterator(self, batch_size, shuffle, include_partial_batch,
+                       repeat):
 
+    # The stored episodes are a contiguous prefix, no gather needed
     transitions = {
-        key: buffers[key][episode_idxs, step_idxs].copy()
-        for key in buffers.keys()
+        key: self._flatten(buffer[:self._current_size]).astype(np.float32,
+                                                               copy=False)
+        for key, buffer in self.buffers.items()
     }
 
-    inds = np.arange(self.stored_steps)
+    # Batches are gathered from transitions below, the full set only needs
+    # a (single) copy when shuffled.
     if shuffle:
-      np.random.shuffle(inds)
-
-    transitions = {
-        key: transitions[key][inds].copy() for key in transitions.keys()
-    }
+      inds = self._rng.permutation(self.stored_steps)
+      transitions = {key: value[inds] for key, value in transitions.items()}
 
     if batch_size == None:
       batch_size = self.stored_steps
@@ -404,10 +450,10 @@ class EpisodeBaseReplayBuffer(ReplayBuffer):
     elif self._current_size < self._size:
       overflow = inc - (self._size - self._current_size)
       idx_a = np.arange(self._current_size, self._size)
-      idx_b = np.random.randint(0, self._current_size, overflow)
+      idx_b = self._rng.integers(0, self._current_size, overflow)
       idx = np.concatenate([idx_a, idx_b])
     else:
-      idx = np.random.randint(0, self._size, inc)
+      idx = self._rng.integers(0, self._size, inc)
 
     if inc == 1:
       idx = idx[0]
@@ -58,6 +58,7 @@ class StepMetric(object, metaclass=abc.ABCMeta):
 
   def __init__(self, name):
     self._name = name
+    self._step_tags = {}
 
   @property
   def name(self):
@@ -100,7 +101,10 @@ class StepMetric(object, metaclass=abc.ABCMeta):
       # Skip plotting the metrics against itself.
       if self.name == step_metric.name:
         continue
-      step_tag = '{} vs {}'.format(self.name, step_metric.name)
+      step_tag = self._step_tags.get(step_metric.name)
+      if step_tag is None:
+        step_tag = '{} vs {}'.format(self.name, step_metric.name)
+        self._step_tags[step_metric.name] = step_tag
       tf.summary.scalar(name=step_tag,
                         data=result,
                         step=int(step_metric.result()))
@@ -1,6 +1,5 @@
 import numpy as np
 import tensorflow as tf
-import tensorflow_probability as tfp
 
 tfk = tf.keras
 
@@ -30,15 +29,21 @@ class Normalizer(tfk.Model):
     self.mean_tf = tf.Variable(tf.zeros(self.shape), trainable=False)
     self.std_tf = tf.Variable(tf.ones(self.shape), trainable=False)
 
+    # (v - mean) / std folded into v * scale - shift. Not tracked, so that
+    # weights and checkpoints only hold the statistics.
+    self._affine = _Affine(self.shape)
+
   @tf.function
   def call(self, v):  # normalize
-    mean_tf, std_tf = self._reshape_for_broadcasting(v)
-    return tf.clip_by_value((v - mean_tf) / std_tf, -self.clip_range,
+    scale_tf, shift_tf = self._reshape_for_broadcasting(
+        v, self._affine.scale, self._affine.shift)
+    return tf.clip_by_value(v * scale_tf - shift_tf, -self.clip_range,
                             self.clip_range)
 
   @tf.function
   def denormalize(self, v):
-    mean_tf, std_tf = self._reshape_for_broadcasting(v)
+    mean_tf, std_tf = self._reshape_for_broadcasting(v, self.mean_tf,
+                                                     self.std_tf)
     return mean_tf + v * std_tf
 
   @tf.function
@@ -54,19 +59,48 @@ class Normalizer(tfk.Model):
             tf.maximum(
                 tf.square(self.eps), self.sumsq_tf / self.count_tf -
                 tf.square(self.sum_tf / self.count_tf))))
+    self.recompute_affine()
+
+  def set_weights(self, weights):
+    """Restores the statistics and recomputes the folded scale and shift. Also
+    accepts weights saved with the folded terms, which are ignored.
+    """
+    stats = [
+        self.eps, self.sum_tf, self.sumsq_tf, self.count_tf, self.mean_tf,
+        self.std_tf
+    ]
+    for var, weight in zip(stats, weights):
+      var.assign(weight)
+    self.recompute_affine()
+
+  def recompute_affine(self):
+    """Recomputes scale and shift from mean and std. Call after restoring the
+    statistics from a checkpoint.
+    """
+    self._affine.scale.assign(1.0 / self.std_tf)
+    self._affine.shift.assign(self.mean_tf * self._affine.scale)
 
-  def _reshape_for_broadcasting(self, v):
+  def _reshape_for_broadcasting(self, v, *stats):
     dim = len(v.shape) - len(self.shape)
-    mean_tf = tf.reshape(self.mean_tf, [1] * dim + list(self.shape))
-    std_tf = tf.reshape(self.std_tf, [1] * dim + list(self.shape))
-    return mean_tf, std_tf
+    return tuple(
+        tf.reshape(stat, [1] * dim + list(self.shape)) for stat in stats)
+
+
+class _Affine(object):
+  """Plain holder for the folded normalization terms, keeps them out of Keras
+  weight tracking.
+  """
+
+  def __init__(self, shape):
+    self.scale = tf.Variable(tf.ones(shape), trainable=False)
+    self.shift = tf.Variable(tf.zeros(shape), trainable=False)
 
 
 def test_normalizer():
   normalizer = Normalizer((2, 2))
-  dist = tfp.distributions.Normal(loc=[[1.0, 2.0], [3.0, 4.0]], scale=2.0)
-  train_data = dist.sample([1000000])
-  test_data = dist.sample([1000000])
+  loc = tf.constant([[1.0, 2.0], [3.0, 4.0]])
+  train_data = loc + 2.0 * tf.random.normal([1000000, 2, 2])
+  test_data = loc + 2.0 * tf.random.normal([1000000, 2, 2])
   normalizer.update(train_data)
   output = normalizer(test_data)
   revert_output = normalizer.denormalize(output)
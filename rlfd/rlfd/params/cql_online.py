@@ -1,5 +1,5 @@
 # yapf: disable
-from copy import deepcopy
+from rlfd.utils.util import merge_dict
 
 # Default Parameters
 default_params = {
@@ -66,4 +66,4 @@ default_params = {
 }
 
 # OpenAI Gym
-gym_mujoco_params = deepcopy(default_params)
+gym_mujoco_params = merge_dict(default_params, {})
@@ -1,5 +1,5 @@
 # yapf: disable
-from copy import deepcopy
+from rlfd.utils.util import merge_dict
 
 # Default Parameters
 default_params = {
@@ -44,4 +44,4 @@ default_params = {
 }
 
 # OpenAI Gym
-gym_mujoco_params = deepcopy(default_params)
\ No newline at end of file
+gym_mujoco_params = merge_dict(default_params, {})
\ No newline at end of file
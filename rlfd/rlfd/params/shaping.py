@@ -1,5 +1,5 @@
 # yapf: disable
-from copy import deepcopy
+from rlfd.utils.util import merge_dict
 
 # NF Shaping Parameters
 nf_params = {
@@ -18,11 +18,12 @@ nf_params = {
     "potential_weight": 3.0,
 }
 # OpenAI Gym
-gym_mujoco_nf_params = deepcopy(nf_params)
-gym_mujoco_nf_params["batch_size"] = 256
-gym_mujoco_nf_params["num_epochs"] = int(1e2)
-gym_mujoco_nf_params["potential_weight"] = int(1e3)
-gym_mujoco_nf_params["reg_loss_weight"] = int(5e2)
+gym_mujoco_nf_params = merge_dict(nf_params, {
+    "batch_size": 256,
+    "num_epochs": int(1e2),
+    "potential_weight": int(1e3),
+    "reg_loss_weight": int(5e2),
+})
 
 # GAN Shaping Parameters
 gan_params = {
@@ -40,12 +41,13 @@ gan_params = {
     "potential_weight": 3.0,
 }
 # OpenAI Gym
-gym_mujoco_gan_params = deepcopy(gan_params)
-gym_mujoco_gan_params["num_epochs"] = int(5e2)
-gym_mujoco_gan_params["batch_size"] = 256
-gym_mujoco_gan_params["latent_dim"] = 10
-gym_mujoco_gan_params["layer_sizes"] = [256, 256]
-gym_mujoco_gan_params["potential_weight"] = 10.0
+gym_mujoco_gan_params = merge_dict(gan_params, {
+    "num_epochs": int(5e2),
+    "batch_size": 256,
+    "latent_dim": 10,
+    "layer_sizes": [256, 256],
+    "potential_weight": 10.0,
+})
 
 # ORL Shaping Parameters
 orl_params = {
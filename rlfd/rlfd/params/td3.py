@@ -1,5 +1,5 @@
 # yapf: disable
-from copy import deepcopy
+from rlfd.utils.util import merge_dict
 
 # Default Parameters
 default_params = {
@@ -54,6 +54,8 @@ default_params = {
         "q_lr": 3e-4,
         "pi_lr": 3e-4,
         "action_l2": 0.0,
+        # float16 hidden layers in the critics (float32 variables)
+        "critic_mixed_precision": False,
         # double q learning
         "soft_target_tau": 5e-3,
         "target_update_freq": 1,
@@ -62,91 +64,106 @@ default_params = {
 }
 
 # OpenAI Gym
-gym_mujoco_params = deepcopy(default_params)
+gym_mujoco_params = merge_dict(default_params, {})
 
 # OpenAI Peg Insertion 2D
-insert_peg_2d_params = deepcopy(default_params)
-insert_peg_2d_params["env_name"] = "YWFetchPegInHole2D-v0"
-insert_peg_2d_params["fix_T"] = True
-insert_peg_2d_params["random_expl_num_cycles"] = 10
-insert_peg_2d_params["num_epochs"] = int(4e2)
-insert_peg_2d_params["num_cycles_per_epoch"] = 10
-insert_peg_2d_params["num_batches_per_cycle"] = 40
-insert_peg_2d_params["expl_num_episodes_per_cycle"] = 4
-insert_peg_2d_params["expl_num_steps_per_cycle"] = None
-insert_peg_2d_params["agent"]["gamma"] = 0.975
-insert_peg_2d_params["agent"]["online_batch_size"] = 256
-insert_peg_2d_params["agent"]["layer_sizes"] = [256, 256]
-insert_peg_2d_params["agent"]["soft_target_tau"] = 5e-2
-insert_peg_2d_params["agent"]["target_update_freq"] = 40
+insert_peg_2d_params = merge_dict(default_params, {
+    "env_name": "YWFetchPegInHole2D-v0",
+    "fix_T": True,
+    "random_expl_num_cycles": 10,
+    "num_epochs": int(4e2),
+    "num_cycles_per_epoch": 10,
+    "num_batches_per_cycle": 40,
+    "expl_num_episodes_per_cycle": 4,
+    "expl_num_steps_per_cycle": None,
+    "agent": {
+        "gamma": 0.975,
+        "online_batch_size": 256,
+        "layer_sizes": [256, 256],
+        "soft_target_tau": 5e-2,
+        "target_update_freq": 40,
+    },
+})
 
 # OpenAI Peg Insertion
-insert_peg_params = deepcopy(default_params)
-insert_peg_params["env_name"] = "YWFetchPegInHoleRandInit-v0"
-insert_peg_params["fix_T"] = True
-insert_peg_params["num_epochs"] = int(4e2)
-insert_peg_params["num_cycles_per_epoch"] = 10
-insert_peg_params["num_batches_per_cycle"] = 40
-insert_peg_params["expl_num_episodes_per_cycle"] = 4
-insert_peg_params["expl_num_steps_per_cycle"] = None
-insert_peg_params["agent"]["gamma"] = 0.975
-insert_peg_params["agent"]["online_batch_size"] = 256
-insert_peg_params["agent"]["expl_gaussian_noise"] = 0.2
-insert_peg_params["agent"]["expl_random_prob"] = 0.2
-insert_peg_params["agent"]["layer_sizes"] = [256, 256, 256]
-insert_peg_params["agent"]["policy_noise"] = 0.1
-insert_peg_params["agent"]["action_l2"] = 0.4
-insert_peg_params["agent"]["soft_target_tau"] = 5e-2
-insert_peg_params["agent"]["target_update_freq"] = 40
+insert_peg_params = merge_dict(default_params, {
+    "env_name": "YWFetchPegInHoleRandInit-v0",
+    "fix_T": True,
+    "num_epochs": int(4e2),
+    "num_cycles_per_epoch": 10,
+    "num_batches_per_cycle": 40,
+    "expl_num_episodes_per_cycle": 4,
+    "expl_num_steps_per_cycle": None,
+    "agent": {
+        "gamma": 0.975,
+        "online_batch_size": 256,
+        "expl_gaussian_noise": 0.2,
+        "expl_random_prob": 0.2,
+        "layer_sizes": [256, 256, 256],
+        "policy_noise": 0.1,
+        "action_l2": 0.4,
+        "soft_target_tau": 5e-2,
+        "target_update_freq": 40,
+    },
+})
 
 # OpenAI Pick Place
-pick_place_params = deepcopy(default_params)
-pick_place_params["env_name"] = "YWFetchPegInHoleRandInit-v0"
-pick_place_params["fix_T"] = True
-pick_place_params["num_epochs"] = int(4e2)
-pick_place_params["num_cycles_per_epoch"] = 10
-pick_place_params["num_batches_per_cycle"] = 40
-pick_place_params["expl_num_episodes_per_cycle"] = 4
-pick_place_params["expl_num_steps_per_cycle"] = None
-pick_place_params["agent"]["gamma"] = 0.975
-pick_place_params["agent"]["online_batch_size"] = 256
-pick_place_params["agent"]["expl_gaussian_noise"] = 0.2
-pick_place_params["agent"]["expl_random_prob"] = 0.2
-pick_place_params["agent"]["layer_sizes"] = [256, 256, 256]
-pick_place_params["agent"]["policy_noise"] = 0.1
-pick_place_params["agent"]["action_l2"] = 0.4
-pick_place_params["agent"]["soft_target_tau"] = 5e-2
-pick_place_params["agent"]["target_update_freq"] = 40
+pick_place_params = merge_dict(default_params, {
+    "env_name": "YWFetchPegInHoleRandInit-v0",
+    "fix_T": True,
+    "num_epochs": int(4e2),
+    "num_cycles_per_epoch": 10,
+    "num_batches_per_cycle": 40,
+    "expl_num_episodes_per_cycle": 4,
+    "expl_num_steps_per_cycle": None,
+    "agent": {
+        "gamma": 0.975,
+        "online_batch_size": 256,
+        "expl_gaussian_noise": 0.2,
+        "expl_random_prob": 0.2,
+        "layer_sizes": [256, 256, 256],
+        "policy_noise": 0.1,
+        "action_l2": 0.4,
+        "soft_target_tau": 5e-2,
+        "target_update_freq": 40,
+    },
+})
 
 # Metaworld
-metaworld_params = deepcopy(default_params)
-metaworld_params["env_name"] = "reach-v1"
-metaworld_params["fix_T"] = True
-metaworld_params["num_epochs"] = int(1e4)
-metaworld_params["num_cycles_per_epoch"] = 10
-metaworld_params["num_batches_per_cycle"] = 40
-metaworld_params["expl_num_episodes_per_cycle"] = 4
-metaworld_params["expl_num_steps_per_cycle"] = None
-metaworld_params["agent"]["online_batch_size"] = 256
-metaworld_params["agent"]["target_update_freq"] = 40
-metaworld_params["agent"]["expl_gaussian_noise"] = 0.2
-metaworld_params["agent"]["layer_sizes"] = [256, 256, 256]
-metaworld_params["agent"]["soft_target_tau"] = 5e-2
+metaworld_params = merge_dict(default_params, {
+    "env_name": "reach-v1",
+    "fix_T": True,
+    "num_epochs": int(1e4),
+    "num_cycles_per_epoch": 10,
+    "num_batches_per_cycle": 40,
+    "expl_num_episodes_per_cycle": 4,
+    "expl_num_steps_per_cycle": None,
+    "agent": {
+        "online_batch_size": 256,
+        "target_update_freq": 40,
+        "expl_gaussian_noise": 0.2,
+        "layer_sizes": [256, 256, 256],
+        "soft_target_tau": 5e-2,
+    },
+})
 
 # Reach2D
-reach2d_params = deepcopy(default_params)
-reach2d_params["env_name"] = "Reach2DF"
-reach2d_params["fix_T"] = True
-reach2d_params["num_epochs"] = int(1e2)
-reach2d_params["num_cycles_per_epoch"] = 10
-reach2d_params["num_batches_per_cycle"] = 40
-reach2d_params["expl_num_episodes_per_cycle"] = 4
-reach2d_params["expl_num_steps_per_cycle"] = None
-reach2d_params["agent"]["gamma"] = 0.95
-reach2d_params["agent"]["online_batch_size"] = 256
-reach2d_params["agent"]["expl_gaussian_noise"] = 0.2
-reach2d_params["agent"]["expl_random_prob"] = 0.2
-reach2d_params["agent"]["layer_sizes"] = [256, 256]
-reach2d_params["agent"]["action_l2"] = 0.4
-reach2d_params["agent"]["soft_target_tau"] = 5e-2
-reach2d_params["agent"]["target_update_freq"] = 40
\ No newline at end of file
+reach2d_params = merge_dict(default_params, {
+    "env_name": "Reach2DF",
+    "fix_T": True,
+    "num_epochs": int(1e2),
+    "num_cycles_per_epoch": 10,
+    "num_batches_per_cycle": 40,
+    "expl_num_episodes_per_cycle": 4,
+    "expl_num_steps_per_cycle": None,
+    "agent": {
+        "gamma": 0.95,
+        "online_batch_size": 256,
+        "expl_gaussian_noise": 0.2,
+        "expl_random_prob": 0.2,
+        "layer_sizes": [256, 256],
+        "action_l2": 0.4,
+        "soft_target_tau": 5e-2,
+        "target_update_freq": 40,
+    },
+})
\ No newline at end of file
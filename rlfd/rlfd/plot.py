@@ -77,6 +77,7 @@ def convert_tensorboard_data_to_csv(path,
       },
   ).Reload()
   tags = summary_iterator.Tags()
+  os.makedirs(osp.join(path, target_dir), exist_ok=True)
   for tag in tags["tensors"]:
     # This is hardcoded in the tensorboard output
     try:
@@ -88,7 +89,6 @@ def convert_tensorboard_data_to_csv(path,
                         for event in summary_iterator.Tensors(tag)])
     df = pd.DataFrame({y_label: xy_data[:, 1], x_label: xy_data[:, 0]})
     tag = tag.replace("/", "_")
-    os.makedirs(osp.join(path, target_dir), exist_ok=True)
     df.to_csv(osp.join(path, target_dir, tag))
 
 
@@ -1,7 +1,5 @@
 import abc
 import tensorflow as tf
-import tensorflow_probability as tfp
-tfd = tfp.distributions
 tfk = tf.keras
 
 
@@ -21,23 +19,25 @@ class Policy(object):
     self._get_action = get_action
     self._process_observation = process_observation
     self._process_action = process_action
+    # Fixed signature so that rollouts with different batch sizes share one
+    # trace and calls skip the retracing check.
+    self._call_graph = tf.function(
+        self._call_graph_impl,
+        input_signature=[tf.TensorSpec((None, *dimo), tf.float32)])
 
   def __call__(self, o):
-    batch_o = o.reshape((-1, *self._dimo))
+    # Accepts a single observation or a batch of them, without reshaping
+    unbatched = o.ndim == len(self._dimo)
+    batch_o = o[None] if unbatched else o
+    assert batch_o.ndim == len(self._dimo) + 1, "Batch dim must be 1."
 
     o_tf = tf.convert_to_tensor(batch_o, dtype=tf.float32)
 
     u = self._call_graph(o_tf).numpy()
 
-    if len(batch_o.shape) != len(o.shape):
-      assert len(batch_o.shape) - len(o.shape) == 1, "Batch dim must be 1."
-      u = u[0]
-    assert u.shape[-len(self._dimu):] == self._dimu
+    return u[0] if unbatched else u
 
-    return u
-
-  @tf.function
-  def _call_graph(self, o):
+  def _call_graph_impl(self, o):
     """TF graph to compute the output."""
     o = self._process_observation(o)
     u = self._get_action(o)
@@ -83,18 +83,19 @@ class EpsilonGreedyPolicy(Policy):
                      process_action)
     self._max_u = max_u
     self._raw_get_action = get_action
-    self._binomial_dist = tfd.Binomial(1, probs=random_prob)
+    self._random_prob = random_prob
 
   def _get_action(self, o):
     u = self._raw_get_action(o)
-    mask = self._binomial_dist.sample(o.shape[0])
+    mask = tf.cast(tf.random.uniform([tf.shape(o)[0]]) < self._random_prob,
+                   tf.float32)
     u_rand = self._random_action(o)
     u = u + tf.reshape(mask, [-1] + [1] * len(self._dimu)) * (u_rand - u)
     return u
 
-  def _random_action(self):
-    return tf.random.uniform([tf.shape(o)[0]] + self._dimu, -1.0,
-                             1.0) * self._max_u
+  def _random_action(self, o):
+    return tf.random.uniform(
+        (tf.shape(o)[0],) + self._dimu, -1.0, 1.0) * self._max_u
 
 
 class GaussianEpsilonGreedyPolicy(Policy):
@@ -113,7 +114,7 @@ class GaussianEpsilonGreedyPolicy(Policy):
     self._max_u = max_u
     self._noise_eps = noise_eps
     self._raw_get_action = get_action
-    self._binomial_dist = tfd.Binomial(1, probs=random_prob)
+    self._random_prob = random_prob
 
   def _get_action(self, o):
     # Add Gaussian noise
@@ -121,7 +122,8 @@ class GaussianEpsilonGreedyPolicy(Policy):
     u = self._raw_get_action(o)
     u = tf.clip_by_value(u + noise, -self._max_u, self._max_u)
     # Epsilon greedy
-    mask = self._binomial_dist.sample(o.shape[0])
+    mask = tf.cast(tf.random.uniform([tf.shape(o)[0]]) < self._random_prob,
+                   tf.float32)
     u_rand = self._random_action(o)
     u = u + tf.reshape(mask, [-1] + [1] * len(self._dimu)) * (u_rand - u)
     return u
@@ -1,7 +1,5 @@
 import numpy as np
 import tensorflow as tf
-import tensorflow_probability as tfp
-tfd = tfp.distributions
 tfk = tf.keras
 tfl = tfk.layers
 
@@ -62,6 +60,7 @@ class GANShaping(shaping.Shaping):
     self.dimo = dims["o"]
     self.dimu = dims["u"]
     self.max_u = max_u
+    self._inv_max_u = 1.0 / max_u
     self.latent_dim = latent_dim
     self.layer_sizes = layer_sizes
     self.norm_obs = norm_obs
@@ -102,8 +101,7 @@ class GANShaping(shaping.Shaping):
     """
     Use the output of the GAN's discriminator as potential.
     """
-    o = self.o_stats.normalize(o)
-    state_tf = tf.concat(axis=1, values=[o, u / self.max_u])
+    state_tf = self._normalize_state(o, u)
 
     potential = self.discriminator(state_tf)
     potential = self.potential_weight * potential
@@ -115,8 +113,7 @@ class GANShaping(shaping.Shaping):
   @tf.function
   def _train_graph(self, o, u):
 
-    o = self.o_stats.normalize(o)
-    state = tf.concat(axis=1, values=[o, u / self.max_u])
+    state = self._normalize_state(o, u)
 
     with tf.GradientTape(persistent=True) as tape:
       fake_data = self.generator(
@@ -163,7 +160,7 @@ class GANShaping(shaping.Shaping):
                         data=disc_loss_tf,
                         step=self.training_step)
 
-    return disc_loss_tf.numpy()
+    return disc_loss_tf
 
   def _evaluate(self, o, u, name="", **kwargs):
     o_tf = tf.convert_to_tensor(o, dtype=tf.float32)
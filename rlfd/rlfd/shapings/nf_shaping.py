@@ -62,6 +62,7 @@ class NFShaping(shaping.Shaping):
     self.dimo = dims["o"]
     self.dimu = dims["u"]
     self.max_u = max_u
+    self._inv_max_u = 1.0 / max_u
     self.num_bijectors = num_bijectors
     self.layer_sizes = layer_sizes
     self.norm_obs = norm_obs
@@ -97,8 +98,7 @@ class NFShaping(shaping.Shaping):
 
   @tf.function
   def potential(self, o, u):
-    o = self.o_stats.normalize(o)
-    state_tf = tf.concat(axis=1, values=[o, u / self.max_u])
+    state_tf = self._normalize_state(o, u)
 
     state_tf = tf.cast(state_tf, tf.float64)
 
@@ -117,8 +117,7 @@ class NFShaping(shaping.Shaping):
   @tf.function
   def _train_graph(self, o, u):
 
-    o = self.o_stats.normalize(o)
-    state = tf.concat(axis=1, values=[o, u / self.max_u])
+    state = self._normalize_state(o, u)
 
     state = tf.cast(state, tf.float64)
 
@@ -152,7 +151,7 @@ class NFShaping(shaping.Shaping):
                         data=loss_tf,
                         step=self.training_step)
 
-    return loss_tf.numpy()
+    return loss_tf
 
   def _evaluate(self, o, u, name="", **kwargs):
     o_tf = tf.convert_to_tensor(o, dtype=tf.float32)
@@ -4,13 +4,10 @@ import pickle
 osp = os.path
 
 import numpy as np
-import ray
-from ray import tune
 import tensorflow as tf
-import tensorflow_probability as tfp
-tfd = tfp.distributions
 
 from rlfd import memory
+from rlfd.utils.util import get_status_reporter
 
 SHAPINGS = {}
 
@@ -51,34 +48,52 @@ class EnsembleShaping(object):
             data_file=demo_file)
 
   def train(self):
+    data = next(self._dataset.sample(return_iterator=True))
+    # Shapings that are not trained (e.g. OfflineRLShaping with num_epochs and
+    # batch_size set to 0) only run their hooks.
+    num_epochs = self.num_epochs if self.batch_size > 0 else 0
+    if num_epochs > 0:
+      dataset = self._make_training_dataset(data)
+      # TODO: should be done on validation set
+      eval_batch = self._dataset.sample(
+          min(self.batch_size, self._dataset.stored_steps))
+
+    report_status = get_status_reporter()
+
     for i, shaping in enumerate(self.shapings):
-      dataset_iter = self._dataset.sample(return_iterator=True,
-                                          shuffle=False,
-                                          include_partial_batch=True)
-      shaping.before_training_hook(data_dir=self._data_dir,
-                                   batch=next(dataset_iter))
+      shaping.before_training_hook(data_dir=self._data_dir, batch=data)
 
       self.training_step = self.shapings[i].training_step
       with tf.summary.record_if(lambda: self.training_step % 200 == 0):
-        for epoch in range(self.num_epochs):
-          dataset_iter = self._dataset.sample(return_iterator=True,
-                                              shuffle=True,
-                                              include_partial_batch=True)
-          dataset_iter(self.batch_size)
-          for batch in dataset_iter:
-            shaping.train(**batch, name="model_" + str(i))
-          # TODO: should be done on validation set
-          shaping.evaluate(**batch, name="model_" + str(i))
+        for epoch in range(num_epochs):
+          self._train_epoch_graph(shaping, dataset, "model_" + str(i))
+          shaping.evaluate(**eval_batch, name="model_" + str(i))
 
           # For ray status updates
-          if ray.is_initialized():
-            try:
-              tune.report(mode="shaping", epoch=epoch)  # ray 0.8.6
-            except:
-              tune.track.log(mode="shaping", epoch=epoch)  # previous versions
+          if report_status:
+            report_status(mode="shaping", epoch=epoch)
 
       shaping.after_training_hook()
 
+  def _make_training_dataset(self, data):
+    # Shuffle, batch and prefetch in tf.data so that batching overlaps with
+    # training. The last partial batch is dropped (data is reshuffled every
+    # epoch) so that all training steps share one input shape.
+    include_partial_batch = self._dataset.stored_steps < self.batch_size
+    dataset = tf.data.Dataset.from_tensor_slices(data)
+    dataset = dataset.shuffle(self._dataset.stored_steps)
+    dataset = dataset.batch(self.batch_size,
+                            drop_remainder=not include_partial_batch)
+    # Plain prefetch, prefetch_to_device cannot be iterated in a tf.function.
+    return dataset.prefetch(tf.data.experimental.AUTOTUNE)
+
+  @tf.function
+  def _train_epoch_graph(self, shaping, dataset, name):
+    """Runs one epoch over dataset in graph, without a Python round trip per
+    batch."""
+    for batch in dataset:
+      shaping.train(**batch, name=name)
+
   def after_training_hook(self, *args, **kwargs):
     pass
 
@@ -136,6 +151,12 @@ class Shaping(object, metaclass=abc.ABCMeta):
   def after_training_hook(self, *args, **kwargs):
     pass
 
+  def _normalize_state(self, o, u):
+    """Returns [normalized o, u / max_u] as the model input. Requires the
+    subclass to define the observation normalizer o_stats and _inv_max_u.
+    """
+    return tf.concat([self.o_stats(o), u * self._inv_max_u], axis=1)
+
   @abc.abstractmethod
   def potential(self, o, u):
     """return the shaping potential, has to be a tf.function"""
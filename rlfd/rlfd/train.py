@@ -1,5 +1,6 @@
 import json
 import logging
+import logging.handlers
 import os
 import pickle
 import sys
@@ -7,12 +8,10 @@ osp = os.path
 
 import numpy as np
 import tensorflow as tf
-import ray
-from ray import tune
 
 from rlfd import (agents, metrics, policies, env_manager, drivers, shapings)
 
-from rlfd.utils.util import set_global_seeds
+from rlfd.utils.util import get_status_reporter, set_global_seeds
 
 
 def get_env_constructor_and_config(params):
@@ -50,7 +49,13 @@ def main(config):
       *[x + "_" + str(config[x]) for x in config["search_params_list"]])
 
   logger = logging.getLogger("rlfd")
-  logger.addHandler(logging.FileHandler(osp.join(root_dir, "train.log")))
+  # Buffer records and write them out in batches instead of flushing the file
+  # on every record. Warnings and errors are written out immediately.
+  file_handler = logging.FileHandler(osp.join(root_dir, "train.log"))
+  logger.addHandler(
+      logging.handlers.MemoryHandler(capacity=64,
+                                     flushLevel=logging.WARNING,
+                                     target=file_handler))
   logger.setLevel(logging.DEBUG)
 
   # Limit gpu memory growth for tensorflow
@@ -73,6 +78,10 @@ def main(config):
   # Seed everything.
   set_global_seeds(params["seed"])
 
+  # Optionally let XLA auto-clustering fuse the dense + activation chains. Off
+  # by default since it is not deterministic.
+  tf.config.optimizer.set_jit(params.get("xla", False))
+
   # Tensorboard summary writer
   summary_writer_path = osp.join(root_dir, "summaries")
   summary_writer = tf.summary.create_file_writer(summary_writer_path,
@@ -100,7 +109,7 @@ def main(config):
   pretrained_agent = None
   if params["pretrained"]:
     pretrained_file = osp.join(root_dir, params["pretrained"] + ".pkl")
-    logger.info("Load pretrained agent: {}.".format(pretrained_file))
+    logger.info("Load pretrained agent: %s.", pretrained_file)
     with open(pretrained_file, "rb") as f:
       pretrained_agent = pickle.load(f)
 
@@ -175,6 +184,9 @@ def main(config):
                              shaping=shaping,
                              pretrained_agent=pretrained_agent)
 
+  # For ray status updates
+  report_status = get_status_reporter()
+
   # Train offline
   agent.before_offline_hook()
   eval_driver.generate_rollouts(observers=offline_testing_metrics)
@@ -197,11 +209,8 @@ def main(config):
     logger.info("Saving agent after offline training.")
 
     # For ray status updates
-    if ray.is_initialized():
-      try:
-        tune.report(mode="offline", epoch=epoch)  # ray 0.8.6
-      except:
-        tune.track.log(mode="offline", epoch=epoch)  # previous versions
+    if report_status:
+      report_status(mode="offline", epoch=epoch)
 
   # Train online
   agent.before_online_hook()
@@ -236,8 +245,5 @@ def main(config):
     logger.info("Saving agent after online training.")
 
     # For ray status updates
-    if ray.is_initialized():
-      try:
-        tune.report(mode="online", epoch=epoch)  # ray 0.8.6
-      except:
-        tune.track.log(mode="online", epoch=epoch)  # previous versions
\ No newline at end of file
+    if report_status:
+      report_status(mode="online", epoch=epoch)
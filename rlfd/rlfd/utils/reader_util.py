@@ -1,5 +1,7 @@
 """Mostly adopted from OpenAI baselines: https://github.com/openai/baselines
 """
+import csv
+import itertools
 import json
 
 import numpy as np
@@ -19,12 +21,16 @@ def read_csv(fname):
 
 
 def load_csv(fname):
+  # Read the file once: header, then stream the remaining rows to numpy.
   with open(fname, "r") as f:
-    lines = [line for line in f]
-  if len(lines) < 2:
-    return None
-  keys = [name.strip() for name in lines[0].split(",")]
-  data = np.genfromtxt(fname, delimiter=",", skip_header=1, filling_values=0.0)
+    header = f.readline()
+    first_row = f.readline()
+    if not first_row:
+      return None
+    keys = [name.strip() for name in next(csv.reader([header]))]
+    data = np.genfromtxt(itertools.chain([first_row], f),
+                         delimiter=",",
+                         filling_values=0.0)
   if data.ndim == 1:
     data = data.reshape(1, -1)
   assert data.ndim == 2
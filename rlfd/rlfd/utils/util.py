@@ -1,5 +1,6 @@
 """Mostly adopted from OpenAI baselines: https://github.com/openai/baselines
 """
+import copy
 import functools
 import importlib
 import inspect
@@ -26,3 +27,29 @@ def set_global_seeds(seed):
 
   np.random.seed(seed)
   random.seed(seed)
+
+
+def get_status_reporter():
+  """Returns the function for ray tune status updates, or None when not running
+  under ray. Resolved once so that training loops do not check every epoch.
+  """
+  import ray
+  from ray import tune
+  if not ray.is_initialized():
+    return None
+  if hasattr(tune, "report"):
+    return tune.report  # ray 0.8.6
+  return tune.track.log  # previous versions
+
+
+def merge_dict(base, overrides):
+  """Returns a deep copy of base updated with the (nested) entries in
+  overrides. The result shares no dicts or lists with either input.
+  """
+  res = copy.deepcopy(base)
+  for k, v in overrides.items():
+    if isinstance(v, dict) and isinstance(res.get(k), dict):
+      res[k] = merge_dict(res[k], v)
+    else:
+      res[k] = copy.deepcopy(v)
+  return res
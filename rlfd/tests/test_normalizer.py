@@ -0,0 +1,21 @@
+import types
+
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from rlfd.agents import sac, td3
+from rlfd.normalizer import Normalizer
+
+
+@pytest.mark.parametrize("agent_cls", [sac.SAC, td3.TD3])
+def test_copy_normalizer_weights(agent_cls):
+  source = Normalizer((3,))
+  source.update(tf.constant(np.random.randn(64, 3) * 5.0 + 2.0, tf.float32))
+  target = Normalizer((3,))
+  # _copy_weights only reads soft_target_tau from the agent
+  fake_agent = types.SimpleNamespace(soft_target_tau=0.05)
+  agent_cls._copy_weights(fake_agent, source, target, 1.0)
+
+  v = tf.constant(np.random.randn(8, 3), tf.float32)
+  np.testing.assert_allclose(target(v).numpy(), source(v).numpy(), rtol=1e-5)
@@ -0,0 +1,50 @@
+import pickle
+
+import numpy as np
+import tensorflow as tf
+
+from rlfd.params.shaping import orl_params
+from rlfd.shapings import EnsembleShaping
+
+DIMO = 3
+DIMU = 2
+NUM_STEPS = 10
+
+
+class EnvWithoutDataset(object):
+  """Demonstrations are loaded from demo_data.npz instead of D4RL."""
+
+  def get_dataset(self):
+    return {}
+
+
+class ZeroQPolicy(object):
+  """Stands in for the pretrained agent used by OfflineRLShaping."""
+
+  def estimate_q_graph(self, o, u):
+    return tf.zeros([tf.shape(o)[0], 1])
+
+
+def test_train_orl_shaping(tmp_path):
+  np.savez(tmp_path / "demo_data.npz",
+           o=np.zeros((NUM_STEPS, DIMO), np.float32),
+           o_2=np.zeros((NUM_STEPS, DIMO), np.float32),
+           u=np.zeros((NUM_STEPS, DIMU), np.float32),
+           r=np.zeros((NUM_STEPS, 1), np.float32),
+           done=np.zeros((NUM_STEPS, 1), np.float32))
+  with open(tmp_path / "pretrained.pkl", "wb") as f:
+    pickle.dump(ZeroQPolicy(), f)
+
+  shaping = EnsembleShaping(**orl_params,
+                            fix_T=False,
+                            dims=dict(o=(DIMO,), u=(DIMU,)),
+                            max_u=1.0,
+                            eps_length=NUM_STEPS,
+                            info={})
+  shaping.before_training_hook(data_dir=str(tmp_path),
+                               env=EnvWithoutDataset())
+  shaping.train()
+  shaping.after_training_hook()
+
+  potential = shaping.potential(tf.zeros([4, DIMO]), tf.zeros([4, DIMU]))
+  assert potential.shape == (4, 1)